@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -10,9 +11,64 @@ class Settings(BaseSettings):
     """Application configuration settings with MySQL support."""
 
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DATABASE_ASYNC: bool = Field(
+        False,
+        description="Serve the core auth and posts endpoints through "
+        "an AsyncSession instead of the threadpool-backed Session.",
+    )
+    DATABASE_ASYNC_URL: Optional[str] = Field(
+        None,
+        description="Async driver URL; derived from DATABASE_URL "
+        "(aiosqlite, asyncpg, aiomysql) when unset.",
+    )
+    DATABASE_REPLICA_URLS: List[str] = Field(
+        default_factory=list,
+        description="Read replica URLs, as a JSON list; read-only "
+        "queries are routed to them when set.",
+    )
+    DATABASE_REPLICA_STRATEGY: str = Field(
+        "round_robin",
+        description="How a session picks its replica: round_robin or "
+        "least_busy (fewest checked-out connections).",
+    )
+    DATABASE_POOL_SIZE: int = Field(
+        5,
+        description="Connections kept open per engine; size it to the "
+        "worker threadpool (40 by default) for sync endpoints.",
+    )
+    DATABASE_MAX_OVERFLOW: int = Field(
+        10,
+        description="Extra connections opened beyond the pool size "
+        "under load (-1 for no limit).",
+    )
+    DATABASE_POOL_TIMEOUT: float = Field(
+        30,
+        description="Seconds to wait for a free connection.",
+    )
+    DATABASE_POOL_RECYCLE: int = Field(
+        3600,
+        description="Reconnect connections older than this many "
+        "seconds (-1 never).",
+    )
+    DATABASE_POOL_PRE_PING: Optional[bool] = Field(
+        None,
+        description="Test connections on checkout; defaults to on for "
+        "server databases and off for SQLite.",
+    )
+    DATABASE_CONNECT_TIMEOUT: int = Field(
+        5,
+        description="Seconds to wait when opening a connection to a "
+        "server database (not used for SQLite).",
+    )
+    INTERNAL_API_TOKEN: Optional[str] = Field(
+        None,
+        description="Token required by the /internal endpoints, sent "
+        "as X-Internal-Token; the endpoints are off when unset.",
+    )
     JWT_SECRET_KEY: str = Field(
         os.getenv("JWT_SECRET_KEY"),
-        description="Secret key for JWT token generation and verification.",
+        description="Secret key for JWT token generation and "
+        "verification.",
     )
     JWT_ALGORITHM: str = Field(
         "HS256",
@@ -22,14 +78,251 @@ class Settings(BaseSettings):
         30,
         description="Expiration time in minutes for JWT tokens.",
     )
+    AUTH_USER_CACHE_SECONDS: int = Field(
+        30,
+        description="How long an authenticated user is cached by "
+        "get_current_user (0 disables the cache).",
+    )
+    AUTH_USER_CACHE_MAX_ENTRIES: int = Field(
+        10000,
+        description="Maximum number of cached authenticated users.",
+    )
+    AUTH_TRUST_TOKEN_CLAIMS: bool = Field(
+        False,
+        description="Let routes that only need the user ID trust the "
+        "verified token instead of loading the user.",
+    )
+    PASSWORD_HASH_WORKERS: int = Field(
+        max(1, (os.cpu_count() or 2) // 2),
+        description="Threads dedicated to bcrypt hashing.",
+    )
+    PASSWORD_HASH_MAX_QUEUE: int = Field(
+        32,
+        description="Hash calls allowed to wait for a worker before "
+        "new ones are rejected with 503.",
+    )
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = Field(
+        5,
+        description="Longest a hash call may wait before a 503.",
+    )
+    JWT_CACHE_MAX_ENTRIES: int = Field(
+        10000,
+        description="Verified tokens cached until expiry (0 disables).",
+    )
     CACHE_EXPIRE_SECONDS: int = Field(
         300,
         description="Cache expiration time in seconds (5 minutes).",
     )
+    CACHE_STALE_SECONDS: int = Field(
+        0,
+        description="Seconds expired data may be served while it is "
+        "refreshed in the background (0 disables).",
+    )
+    CACHE_REFRESH_WORKERS: int = Field(
+        2,
+        description="Threads running background cache refreshes.",
+    )
+    CACHE_LOAD_TIMEOUT_SECONDS: float = Field(
+        10,
+        description="How long a coalesced cache miss waits for the "
+        "in-flight load before loading on its own.",
+    )
+    CACHE_MAX_ENTRIES: int = Field(
+        10000,
+        description="Maximum number of entries held by the cache.",
+    )
+    CACHE_MAX_BYTES: int = Field(
+        64 * 1024 * 1024,
+        description="Approximate memory budget of the cache in bytes.",
+    )
+    CACHE_BACKEND: str = Field(
+        "memory",
+        description="Cache engine: 'memory' or 'redis' (L1 + shared L2).",
+    )
+    REDIS_URL: str = Field(
+        "redis://localhost:6379/0",
+        description="Redis URL used by the shared L2 cache.",
+    )
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = Field(
+        0.5,
+        description="Seconds to wait for a Redis connection before "
+        "falling back to the L1 cache.",
+    )
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = Field(
+        0.5,
+        description="Seconds to wait for a Redis reply before falling "
+        "back to the L1 cache.",
+    )
+    CACHE_KEY_PREFIX: str = Field(
+        "fastapi_mvc:",
+        description="Prefix applied to every key stored in Redis.",
+    )
+    CACHE_L1_MAX_ENTRIES: int = Field(
+        1000,
+        description="Maximum number of entries in the local L1 cache.",
+    )
+    CACHE_L1_EXPIRE_SECONDS: int = Field(
+        30,
+        description="Upper bound on how long L1 keeps an entry.",
+    )
+    CACHE_INVALIDATION_CHANNEL: str = Field(
+        "fastapi_mvc:cache-invalidation",
+        description="Pub/sub channel used to evict L1 copies.",
+    )
+    POSTS_PAGE_SIZE: int = Field(
+        50,
+        description="Default number of posts returned per page.",
+    )
+    POSTS_MAX_PAGE_SIZE: int = Field(
+        200,
+        description="Largest page size a client may request.",
+    )
+    SEARCH_BACKEND: str = Field(
+        "auto",
+        description="Post search index: 'auto' (SQLite FTS5 or a "
+        "PostgreSQL tsvector index, else in-process) or 'memory'.",
+    )
+    SEARCH_LANGUAGE: str = Field(
+        "english",
+        description="PostgreSQL text search configuration.",
+    )
+    SEARCH_MAX_TERMS: int = Field(
+        16,
+        description="Search terms used from a query; the rest are "
+        "ignored.",
+    )
+    SEARCH_MAX_OFFSET: int = Field(
+        1000,
+        description="Deepest result offset a search may request.",
+    )
+    SEARCH_MEMORY_MAX_USERS: int = Field(
+        1000,
+        description="Users whose in-process search index is kept.",
+    )
+    POSTS_EXPORT_BATCH_SIZE: int = Field(
+        500,
+        description="Rows fetched per round trip by GET /posts/export.",
+    )
+    POSTS_BATCH_MAX_ITEMS: int = Field(
+        1000,
+        description="Most posts accepted by one POST /posts/batch.",
+    )
+    POSTS_BATCH_MAX_BYTES: int = Field(
+        16 * 1024 * 1024,
+        description="Maximum size of a POST /posts/batch payload.",
+    )
+    POSTS_GROUP_COMMIT: bool = Field(
+        False,
+        description="Coalesce concurrent POST /posts/ into shared "
+        "commits.",
+    )
+    POSTS_GROUP_COMMIT_WINDOW_MS: float = Field(
+        2,
+        description="How long a group commit waits for more posts.",
+    )
+    POSTS_GROUP_COMMIT_MAX_BATCH: int = Field(
+        128,
+        description="Most posts committed by one group commit.",
+    )
+    POSTS_GROUP_COMMIT_TIMEOUT_SECONDS: float = Field(
+        30,
+        description="How long a request waits for its group commit "
+        "before failing.",
+    )
     MAX_POST_SIZE_BYTES: int = Field(
         1024 * 1024,  
         description="Maximum allowed size for post content in bytes.",
     )
+    METRICS_ENABLED: bool = Field(
+        True,
+        description="Record per-route request metrics and serve them "
+        "at /metrics.",
+    )
+    SQL_STATS_ENABLED: bool = Field(
+        True,
+        description="Count the SQL statements and DB time of each "
+        "request.",
+    )
+    SQL_STATS_DEBUG: bool = Field(
+        False,
+        description="Log per-request SQL totals and return them in "
+        "X-DB-Query-Count and X-DB-Time-Ms headers.",
+    )
+    SQL_DUPLICATE_WARN_THRESHOLD: int = Field(
+        5,
+        description="Warn when one request runs the same SQL this many "
+        "times (a likely N+1); 0 disables.",
+    )
+    SQL_QUERY_BUDGETS: Dict[str, int] = Field(
+        default_factory=dict,
+        description='Most statements per route, as JSON keyed by '
+        '"METHOD /path", e.g. {"GET /posts/": 2}.',
+    )
+    SQL_QUERY_BUDGET_STRICT: bool = Field(
+        False,
+        description="Raise instead of logging when a request exceeds "
+        "its query budget (for tests).",
+    )
+    COMPRESSION_ENABLED: bool = Field(
+        True,
+        description="Compress responses with gzip, or zstd when the "
+        "zstandard package is installed and the client accepts it.",
+    )
+    COMPRESSION_MIN_BYTES: int = Field(
+        1024,
+        description="Smallest body compressed; smaller ones cost more "
+        "CPU than the bytes saved.",
+    )
+    COMPRESSION_CONTENT_TYPES: List[str] = Field(
+        [
+            "application/json",
+            "application/x-ndjson",
+            "text/plain",
+            "text/html",
+        ],
+        description="Media types that are compressed.",
+    )
+    COMPRESSION_GZIP_LEVEL: int = Field(
+        1,
+        description="gzip compression level, 1 to 9; higher levels "
+        "cost several times the CPU for a few percent fewer bytes.",
+    )
+    COMPRESSION_ZSTD_LEVEL: int = Field(
+        3,
+        description="zstd compression level, 1 to 22.",
+    )
+    SERVER_TIMING_ENABLED: bool = Field(
+        True,
+        description="Time the jwt, auth, cache, db and serialize phases "
+        "of each request and log them to the app.access logger.",
+    )
+    SERVER_TIMING_HEADER: bool = Field(
+        False,
+        description="Also return the phase timings in a Server-Timing "
+        "response header.",
+    )
+    PROFILING_ENABLED: bool = Field(
+        False,
+        description="Install the request profiler; when off it adds no "
+        "overhead.",
+    )
+    PROFILING_SAMPLE_RATE: float = Field(
+        0.0,
+        description="Share of requests profiled at random, from 0 to 1.",
+    )
+    PROFILING_SECRET: Optional[str] = Field(
+        None,
+        description="Key signing X-Profile-Token headers that request a "
+        "profile; tokens are refused when unset.",
+    )
+    PROFILING_DIR: str = Field(
+        "./profiles",
+        description="Directory profiles are written to.",
+    )
+    PROFILING_MAX_FILES: int = Field(
+        100,
+        description="Profiles kept on disk; the oldest are deleted.",
+    )
 
     class Config:
         env_file = ".env"
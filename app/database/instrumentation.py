@@ -0,0 +1,120 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.timing import current_timings, record_phase
+
+
+class QueryStats:
+    """SQL statements run on behalf of one unit of work."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """Add one executed statement."""
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def duplicates(self, threshold: int) -> List[Tuple[str, int]]:
+        """Get statements run at least threshold times.
+
+        Args:
+            threshold: Smallest repeat count to report.
+
+        Returns:
+            List[Tuple[str, int]]: Statements and their counts, most
+            repeated first.
+        """
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Attribute statements run in this context to a QueryStats.
+
+    The context is copied into threadpool calls, so statements of sync
+    endpoints and dependencies are counted too. Work on other threads
+    (cache refreshes, the group-commit writer) is not.
+
+    Yields:
+        QueryStats: Stats filled in as statements run.
+    """
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    if (
+        current_query_stats.get() is not None
+        or current_timings.get() is not None
+    ):
+        conn.info.setdefault("query_started", []).append(
+            time.perf_counter()
+        )
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    record_phase("db", duration)
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute.
+    conn = exception_context.connection
+    if conn is None or exception_context.execution_context is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        started.pop()
+
+
+def install_query_hooks() -> None:
+    """Attach the statement timing hooks to every engine.
+
+    Idempotent. Statements run outside track_queries() and timed
+    requests only pay for two context variable lookups.
+    """
+    if not event.contains(
+        Engine, "before_cursor_execute", _before_cursor_execute
+    ):
+        event.listen(
+            Engine, "before_cursor_execute", _before_cursor_execute
+        )
+        event.listen(
+            Engine, "after_cursor_execute", _after_cursor_execute
+        )
+        event.listen(Engine, "handle_error", _handle_error)
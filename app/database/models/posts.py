@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -8,6 +8,9 @@ class Post(Base):
     """Post model for MySQL database."""
 
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_owner_id_id", "owner_id", "id"),
+    )
 
     id = Column(
         Integer,
@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolMetricsMixin:
+    """Record checkout wait time and connection churn of a pool.
+
+    Mixed into a QueuePool subclass; ``stats()`` reports the pool's
+    live occupancy next to cumulative counters, so the pool can be
+    right-sized under load. Counters restart when the pool is
+    recreated (e.g. by ``engine.dispose()``).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._invalidations = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        event.listen(self, "connect", self._on_connect)
+        event.listen(self, "invalidate", self._on_invalidate)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._metrics_lock:
+                self._checkouts += 1
+                self._wait_seconds += waited
+                self._max_wait_seconds = max(
+                    self._max_wait_seconds, waited
+                )
+
+    def stats(self) -> Dict[str, float]:
+        """Get pool occupancy and checkout counters.
+
+        Returns:
+            Dict[str, float]: Configured size and overflow, connections
+            checked out and idle, current overflow, checkouts, timeouts,
+            new connections, invalidations (including failed pre-pings)
+            and mean and worst checkout wait in milliseconds.
+        """
+        with self._metrics_lock:
+            checkouts = self._checkouts or 1
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(0, self.overflow()),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connects": self._connects,
+                "invalidations": self._invalidations,
+                "avg_wait_ms": self._wait_seconds / checkouts * 1000,
+                "max_wait_ms": self._max_wait_seconds * 1000,
+            }
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._metrics_lock:
+            self._connects += 1
+
+    def _on_invalidate(
+        self, dbapi_connection, connection_record, exception
+    ) -> None:
+        with self._metrics_lock:
+            self._invalidations += 1
+
+
+class InstrumentedQueuePool(PoolMetricsMixin, QueuePool):
+    """QueuePool that records checkout metrics."""
+
+
+class InstrumentedAsyncQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout metrics."""
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    """Describe a pool, with metrics when it is instrumented.
+
+    Args:
+        pool: Pool of a sync engine.
+
+    Returns:
+        Dict[str, Any]: The pool's stats, or its status line for
+        pools that don't record any (e.g. an in-memory SQLite
+        StaticPool).
+    """
+    if isinstance(pool, PoolMetricsMixin):
+        return pool.stats()
+    return {"status": pool.status()}
@@ -0,0 +1,89 @@
+import itertools
+import threading
+from typing import Any, List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+ROUTING_STRATEGIES = ("round_robin", "least_busy")
+
+
+class ReplicaSet:
+    """Read replicas and the strategy for picking one per statement.
+
+    ``round_robin`` cycles through the replicas; ``least_busy`` picks
+    the replica whose pool has the fewest connections checked out,
+    which favours replicas that are answering quickly.
+    """
+
+    def __init__(self, engines: List[Engine], strategy: str):
+        if not engines:
+            raise ValueError("ReplicaSet needs at least one engine")
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(
+                f"Unknown replica strategy {strategy!r}, expected "
+                f"one of {', '.join(ROUTING_STRATEGIES)}"
+            )
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
+
+    def pick(self) -> Engine:
+        """Choose the replica for the next read."""
+        if self.strategy == "least_busy":
+            return min(self.engines, key=self._checked_out)
+        with self._lock:
+            return next(self._cycle)
+
+    @staticmethod
+    def _checked_out(engine: Engine) -> int:
+        checkedout = getattr(engine.pool, "checkedout", None)
+        return checkedout() if checkedout is not None else 0
+
+
+def use_primary(db: Any) -> None:
+    """Send every later statement of a session to the primary.
+
+    Works on both Session and AsyncSession; sessions that don't route
+    ignore it.
+
+    Args:
+        db: Session to pin.
+    """
+    db.info["use_primary"] = True
+
+
+class RoutingSession(Session):
+    """Session that sends plain reads to replicas.
+
+    A session reads from one replica, picked on its first read, so
+    its reads see a single replica's state and it holds at most one
+    replica connection. Flushes, DML statements and
+    ``SELECT ... FOR UPDATE`` go to the primary (the session's bind),
+    and so does everything after the first of them, so a request
+    reads its own writes. use_primary() pins a session up front.
+    """
+
+    def __init__(self, replicas: ReplicaSet, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.replicas = replicas
+        self._replica: Optional[Engine] = None
+
+    def get_bind(
+        self,
+        mapper: Optional[Any] = None,
+        clause: Optional[Any] = None,
+        **kwargs: Any,
+    ):
+        if not self.info.get("use_primary"):
+            if not (
+                self._flushing
+                or getattr(clause, "is_dml", False)
+                or getattr(clause, "_for_update_arg", None) is not None
+            ):
+                if self._replica is None:
+                    self._replica = self.replicas.pick()
+                return self._replica
+            self.info["use_primary"] = True
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
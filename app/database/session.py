@@ -1,30 +1,166 @@
-from typing import Generator
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    Type,
+    TypeVar,
+)
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.config import settings
+from app.database.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+)
+from app.database.routing import ReplicaSet, RoutingSession
 
 DATABASE_URL = settings.DATABASE_URL
 
+ModelT = TypeVar("ModelT")
 
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=3600,
-    pool_pre_ping=True,
-    connect_args={"connect_timeout": 5},
-)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Derive the async-driver URL for a sync database URL.
+
+    Args:
+        url: Sync SQLAlchemy database URL.
+
+    Returns:
+        str: Same database addressed through its asyncio driver.
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS[parsed.get_backend_name()]
+    return parsed.set(drivername=drivername).render_as_string(
+        hide_password=False
+    )
+
+
+def get_engine_options(url: str, is_async: bool = False) -> Dict:
+    """Build pool and connect options for a database URL.
+
+    Pool sizing comes from the DATABASE_POOL_* settings. The rest
+    depends on the backend: in-memory SQLite shares one connection,
+    file SQLite skips pre-ping, and server databases get a
+    connect_timeout.
+
+    Args:
+        url: SQLAlchemy database URL.
+        is_async: Whether the URL is for an async engine.
+
+    Returns:
+        Dict: Keyword arguments for create_engine.
+    """
+    parsed = make_url(url)
+    is_sqlite = parsed.get_backend_name() == "sqlite"
+    if is_sqlite and parsed.database in (None, "", ":memory:"):
+        return {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    pre_ping = settings.DATABASE_POOL_PRE_PING
+    # asyncpg spells connect_timeout "timeout".
+    timeout_arg = (
+        "timeout"
+        if parsed.get_driver_name() == "asyncpg"
+        else "connect_timeout"
+    )
+    return {
+        "poolclass": (
+            InstrumentedAsyncQueuePool
+            if is_async
+            else InstrumentedQueuePool
+        ),
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": (
+            not is_sqlite if pre_ping is None else pre_ping
+        ),
+        "connect_args": (
+            {}
+            if is_sqlite
+            else {timeout_arg: settings.DATABASE_CONNECT_TIMEOUT}
+        ),
+    }
+
+
+engine = create_engine(DATABASE_URL, **get_engine_options(DATABASE_URL))
 
-SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine
+replica_engines = [
+    create_engine(url, **get_engine_options(url))
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+SessionLocal = (
+    sessionmaker(
+        class_=RoutingSession,
+        replicas=ReplicaSet(
+            replica_engines, settings.DATABASE_REPLICA_STRATEGY
+        ),
+        autocommit=False,
+        autoflush=False,
+        bind=engine,
+    )
+    if replica_engines
+    else sessionmaker(autocommit=False, autoflush=False, bind=engine)
 )
 
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    ASYNC_DATABASE_URL = settings.DATABASE_ASYNC_URL or (
+        get_async_database_url(DATABASE_URL)
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        **get_engine_options(ASYNC_DATABASE_URL, is_async=True),
+    )
+    async_replica_engines = [
+        create_async_engine(
+            async_url, **get_engine_options(async_url, is_async=True)
+        )
+        for async_url in map(
+            get_async_database_url, settings.DATABASE_REPLICA_URLS
+        )
+    ]
+    AsyncSessionLocal = (
+        async_sessionmaker(
+            async_engine,
+            sync_session_class=RoutingSession,
+            replicas=ReplicaSet(
+                [e.sync_engine for e in async_replica_engines],
+                settings.DATABASE_REPLICA_STRATEGY,
+            ),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        if async_replica_engines
+        else async_sessionmaker(
+            async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    )
+
 Base = declarative_base()
 
 
@@ -39,3 +175,58 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    """Provide an async database session for dependency injection.
+
+    Only available when ``DATABASE_ASYNC`` is enabled.
+
+    Yields:
+        AsyncGenerator: Async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def insert_returning(
+    db: Session, model: Type[ModelT], **values: Any
+) -> ModelT:
+    """Insert one row and get it back in the same round trip.
+
+    Uses INSERT ... RETURNING where the backend supports it and a
+    plain ORM flush elsewhere. The object is detached before the
+    caller commits, so reading it afterwards does not reload it.
+
+    Args:
+        db: Database session.
+        model: Mapped class to insert.
+        **values: Column values of the new row.
+
+    Returns:
+        ModelT: The inserted row as a detached object.
+    """
+    if db.get_bind().dialect.insert_returning:
+        obj = db.scalar(insert(model).values(**values).returning(model))
+    else:
+        obj = model(**values)
+        db.add(obj)
+        db.flush()
+    db.expunge(obj)
+    return obj
+
+
+async def ainsert_returning(
+    db: AsyncSession, model: Type[ModelT], **values: Any
+) -> ModelT:
+    """Async variant of insert_returning."""
+    if db.get_bind().dialect.insert_returning:
+        obj = await db.scalar(
+            insert(model).values(**values).returning(model)
+        )
+    else:
+        obj = model(**values)
+        db.add(obj)
+        await db.flush()
+    db.expunge(obj)
+    return obj
@@ -1,22 +1,80 @@
-from fastapi import Depends, HTTPException, Request, status
+import hmac
+from typing import Optional, Union
+
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.database.models import User
-from app.database.session import get_db
+from app.database.session import get_async_db, get_db
+from app.services.auth import AuthService
+from app.utils.exceptions import SecurityException
+from app.utils.security import SecurityUtils
+from app.utils.timing import phase
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(
+class TokenPrincipal:
+    """Caller identified only by the claims of a verified token."""
+
+    __slots__ = ("id",)
+
+    def __init__(self, id: int):
+        self.id = id
+
+
+Principal = Union[User, TokenPrincipal]
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_token_subject(token: str) -> str:
+    """Decode a bearer token and return its subject.
+
+    Verified tokens are cached until they expire, so repeated requests
+    with the same token skip signature verification.
+
+    Args:
+        token: JWT token from request.
+
+    Returns:
+        str: The ``sub`` claim (user ID).
+
+    Raises:
+        HTTPException: If the token is invalid or has no subject.
+    """
+    try:
+        payload = SecurityUtils.decode_token(token)
+    except SecurityException:
+        raise _credentials_exception()
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise _credentials_exception()
+    return user_id
+
+
+def get_current_user(
     request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> User:
     """Dependency to get current authenticated user.
 
+    Declared as a plain function so FastAPI runs the blocking query
+    in its threadpool instead of on the event loop. The returned user
+    is detached from the session and served from AuthService's
+    principal cache when possible.
+
     Args:
         request: FastAPI request object.
         token: JWT token from request.
@@ -28,29 +86,117 @@ async def get_current_user(
     Raises:
         HTTPException: If authentication fails.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    user_id = get_token_subject(token)
+    with phase("auth"):
+        user = AuthService.get_cached_user(user_id)
+        if user is not None:
+            return user
+
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise _credentials_exception()
+
+        # End the read transaction so the request does not hold a
+        # pooled connection while it is served from cache or by
+        # another session.
+        db.expunge(user)
+        db.rollback()
+        AuthService.cache_user(user)
+        return user
+
+
+async def get_current_user_async(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """Dependency to get current authenticated user via AsyncSession.
+
+    Args:
+        request: FastAPI request object.
+        token: JWT token from request.
+        db: Async database session.
+
+    Returns:
+        User: Authenticated user.
 
+    Raises:
+        HTTPException: If authentication fails.
+    """
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        user_id = int(get_token_subject(token))
+    except ValueError:
+        raise _credentials_exception()
+    with phase("auth"):
+        user = AuthService.get_cached_user(user_id)
+        if user is not None:
+            return user
+
+        user = await db.scalar(select(User).where(User.id == user_id))
+        if user is None:
+            raise _credentials_exception()
+
+        db.expunge(user)
+        await db.rollback()
+        AuthService.cache_user(user)
+        return user
+
+
+def _principal_from_claims(token: str) -> TokenPrincipal:
+    try:
+        return TokenPrincipal(int(get_token_subject(token)))
+    except ValueError:
+        raise _credentials_exception()
+
+
+def get_current_principal(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """Dependency for routes that only need the caller's ID.
+
+    With AUTH_TRUST_TOKEN_CLAIMS the verified token is trusted and no
+    lookup happens, so a deleted user keeps access until the token
+    expires. Otherwise this is get_current_user.
+
+    Args:
+        request: FastAPI request object.
+        token: JWT token from request.
+        db: Database session, unused when claims are trusted.
+
+    Returns:
+        Principal: Object exposing at least ``id``.
+
+    Raises:
+        HTTPException: If authentication fails.
+    """
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        return _principal_from_claims(token)
+    return get_current_user(request, token, db)
+
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+async def get_current_principal_async(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """Async counterpart of get_current_principal.
+
+    Args:
+        request: FastAPI request object.
+        token: JWT token from request.
+        db: Async database session, unused when claims are trusted.
+
+    Returns:
+        Principal: Object exposing at least ``id``.
 
-    return user
+    Raises:
+        HTTPException: If authentication fails.
+    """
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        return _principal_from_claims(token)
+    return await get_current_user_async(request, token, db)
 
 
 def validate_post_size(request: Request) -> None:
@@ -72,3 +218,59 @@ def validate_post_size(request: Request) -> None:
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"Payload too large. Max size is {settings.MAX_POST_SIZE_BYTES} bytes",
         )
+
+
+def validate_post_batch_size(request: Request) -> None:
+    """Dependency to validate a batch of posts' payload size.
+
+    The whole payload is capped by POSTS_BATCH_MAX_BYTES; each
+    post's text is already limited in length by PostCreate.
+
+    Args:
+        request: FastAPI request object.
+
+    Raises:
+        HTTPException: If payload exceeds size limit.
+    """
+    content_length = request.headers.get("content-length")
+    if (
+        content_length
+        and int(content_length)
+        > settings.POSTS_BATCH_MAX_BYTES
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                "Payload too large. Max size is "
+                f"{settings.POSTS_BATCH_MAX_BYTES} bytes"
+            ),
+        )
+
+
+def verify_internal_token(
+    x_internal_token: Optional[str] = Header(None),
+) -> None:
+    """Dependency guarding the /internal endpoints.
+
+    The endpoints answer 404 unless INTERNAL_API_TOKEN is set, and
+    403 unless the X-Internal-Token header matches it.
+
+    Args:
+        x_internal_token: Value of the X-Internal-Token header.
+
+    Raises:
+        HTTPException: If disabled or the token does not match.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+    if not x_internal_token or not hmac.compare_digest(
+        x_internal_token.encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid internal token",
+        )
@@ -1,14 +1,45 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import settings
 from app.database import Base
-from app.database.session import engine
-from app.routes import auth, posts
+from app.database.instrumentation import install_query_hooks
+from app.database.session import (
+    async_engine,
+    async_replica_engines,
+    engine,
+)
+from app.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    ServerTimingMiddleware,
+    SQLStatsMiddleware,
+)
+from app.middleware.profiling import profile_threadpool_calls
+from app.routes import (
+    async_auth,
+    async_posts,
+    auth,
+    internal,
+    metrics,
+    posts,
+)
+from app.services import SearchService
+from app.services.posts import post_writer
 
 
 def create_tables():
-    """Create database tables."""
+    """Create database tables, their indexes and the search index.
+
+    create_all skips tables that already exist, so indexes added to a
+    model later are created one by one to reach existing databases.
+    """
     Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    SearchService.setup(engine)
 
 
 def get_application():
@@ -27,14 +58,45 @@ def get_application():
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+    if settings.SQL_STATS_ENABLED or settings.SERVER_TIMING_ENABLED:
+        install_query_hooks()
+    if settings.SQL_STATS_ENABLED:
+        app.add_middleware(SQLStatsMiddleware)
+    if settings.SERVER_TIMING_ENABLED:
+        app.add_middleware(ServerTimingMiddleware)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
 
+    if settings.DATABASE_ASYNC:
+        # Registered first so they shadow their sync counterparts;
+        # endpoints without an async variant fall through.
+        app.include_router(async_auth.router)
+        app.include_router(async_posts.router)
     app.include_router(auth.router)
     app.include_router(posts.router)
+    app.include_router(internal.router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router)
+    if settings.PROFILING_ENABLED:
+        profile_threadpool_calls(app)
 
     @app.on_event("startup")
     async def startup():
         create_tables()
 
+    @app.on_event("shutdown")
+    async def shutdown():
+        if post_writer is not None:
+            post_writer.stop()
+        if async_engine is not None:
+            await async_engine.dispose()
+        for replica in async_replica_engines:
+            await replica.dispose()
+
     return app
 
 
@@ -0,0 +1,5 @@
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .sql_stats import SQLStatsMiddleware
+from .timing import ServerTimingMiddleware
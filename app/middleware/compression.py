@@ -0,0 +1,195 @@
+import zlib
+from functools import lru_cache
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.timing import phase
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Server preference, best first; zstd only when zstandard is installed.
+ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the content coding to use for an Accept-Encoding header.
+
+    The client's q-values win; ties go to the server's preference in
+    ENCODINGS. Results are memoized since clients send a handful of
+    distinct headers.
+
+    Args:
+        accept_encoding: Accept-Encoding header value, if any.
+
+    Returns:
+        Optional[str]: "zstd", "gzip", or None for identity.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a whole body with the configured level.
+
+    Args:
+        body: Body to compress.
+        encoding: "zstd" or "gzip".
+
+    Returns:
+        bytes: Compressed body.
+    """
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(
+            level=settings.COMPRESSION_ZSTD_LEVEL
+        ).compress(body)
+    compressor = zlib.compressobj(
+        settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31
+    )
+    return compressor.compress(body) + compressor.flush()
+
+
+class _StreamCompressor:
+    """Compress a streamed body chunk by chunk.
+
+    Every chunk is flushed, so a client reading an NDJSON stream gets
+    each line as soon as the app yields it.
+    """
+
+    def __init__(self, encoding: str):
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(
+                level=settings.COMPRESSION_ZSTD_LEVEL
+            ).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._compressor = zlib.compressobj(
+                settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31
+            )
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+
+    def compress(self, chunk: bytes, last: bool) -> bytes:
+        data = self._compressor.compress(chunk)
+        if last:
+            return data + self._compressor.flush()
+        return data + self._compressor.flush(self._flush_mode)
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Check a Content-Type against COMPRESSION_CONTENT_TYPES."""
+    if not content_type:
+        return False
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type in settings.COMPRESSION_CONTENT_TYPES
+
+
+class CompressionMiddleware:
+    """Compress response bodies with gzip, or zstd when available.
+
+    The coding is negotiated from Accept-Encoding. Responses are left
+    alone when their Content-Type is not in COMPRESSION_CONTENT_TYPES,
+    when they already have a Content-Encoding (for instance a
+    precompressed variant served from cache), or when a single-message
+    body is smaller than COMPRESSION_MIN_BYTES. Streaming bodies are
+    compressed as they go, since their size is not known up front.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.min_bytes = settings.COMPRESSION_MIN_BYTES
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding")
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or "no-transform" in headers.get("cache-control", "")
+                    or not is_compressible(headers.get("content-type"))
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk tells us
+                    # whether and how the body is compressed.
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(scope=start)
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.min_bytes:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _StreamCompressor(encoding)
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    with phase("compress"):
+                        body = compressor.compress(body, last=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({**message, "body": body})
+                    return
+                await send(start)
+
+            with phase("compress"):
+                data = compressor.compress(body, last=not more_body)
+            await send({**message, "body": data})
+
+        await self.app(scope, receive, send_compressed)
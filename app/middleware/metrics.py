@@ -0,0 +1,190 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RouteMetrics:
+    """Request counters and latency histogram of one route."""
+
+    __slots__ = ("buckets", "total_seconds", "count", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total_seconds = 0.0
+        self.count = 0
+        self.statuses: Dict[int, int] = {}
+
+    def observe(self, status: int, seconds: float) -> None:
+        """Record one finished request."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total_seconds += seconds
+        self.count += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+class MetricsRegistry:
+    """Per-route HTTP metrics of this worker process.
+
+    Only ever updated from the event loop thread, by MetricsMiddleware,
+    and read there by the async /metrics endpoint, so recording takes
+    no locks. Each worker process keeps and serves its own numbers.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def observe(
+        self, method: str, route: str, status: int, seconds: float
+    ) -> None:
+        """Record one finished request."""
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.observe(status, seconds)
+
+    def clear(self) -> None:
+        """Forget everything recorded so far."""
+        self.routes.clear()
+
+    def render(self) -> List[str]:
+        """Render request metrics in the Prometheus text format."""
+        lines = [
+            "# HELP http_requests_total Finished HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        routes = sorted(self.routes.items())
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                labels = format_labels(
+                    method=method, route=route, status=status
+                )
+                lines.append(f"http_requests_total{labels} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in routes:
+            cumulative = 0
+            bounds = [*map(str, LATENCY_BUCKETS), "+Inf"]
+            for bound, count in zip(bounds, metrics.buckets):
+                cumulative += count
+                labels = format_labels(
+                    method=method, route=route, le=bound
+                )
+                lines.append(
+                    f"http_request_duration_seconds_bucket{labels} "
+                    f"{cumulative}"
+                )
+            labels = format_labels(method=method, route=route)
+            lines.append(
+                f"http_request_duration_seconds_sum{labels} "
+                f"{metrics.total_seconds}"
+            )
+            lines.append(
+                f"http_request_duration_seconds_count{labels} "
+                f"{metrics.count}"
+            )
+
+        lines += gauge(
+            "http_requests_in_flight",
+            "HTTP requests being served.",
+            [("", self.in_flight)],
+        )
+        return lines
+
+
+def format_labels(**labels: object) -> str:
+    """Format Prometheus labels, escaping their values."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def gauge(
+    name: str, help_text: str, samples: Iterable[Tuple[str, float]]
+) -> List[str]:
+    """Render a metric whose samples carry preformatted labels."""
+    return _metric(name, help_text, "gauge", samples)
+
+
+def counter(
+    name: str, help_text: str, samples: Iterable[Tuple[str, float]]
+) -> List[str]:
+    """Render a counter whose samples carry preformatted labels."""
+    return _metric(name, help_text, "counter", samples)
+
+
+def _metric(
+    name: str,
+    help_text: str,
+    kind: str,
+    samples: Iterable[Tuple[str, float]],
+) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{labels} {value}" for labels, value in samples]
+    return lines
+
+
+metrics_registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Record count, status and latency of every HTTP request.
+
+    Latency runs until the app returns, so it includes streaming
+    bodies. Requests that match no route share one label, which keeps
+    label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = None):
+        self.app = app
+        self.registry = registry or metrics_registry
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry = self.registry
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            registry.observe(
+                scope["method"],
+                route,
+                status,
+                time.perf_counter() - started,
+            )
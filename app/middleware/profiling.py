@@ -0,0 +1,257 @@
+import cProfile
+import functools
+import hashlib
+import hmac
+import inspect
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from anyio.to_thread import run_sync
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.prof$")
+
+
+def sign_profile_token(ttl_seconds: int = 300) -> str:
+    """Create a token that requests a profile until it expires.
+
+    Send it as the X-Profile-Token header. Signed with
+    PROFILING_SECRET, so only holders of the secret can trigger
+    profiling.
+
+    Args:
+        ttl_seconds: How long the token stays valid.
+
+    Returns:
+        str: ``<expiry>.<signature>``.
+    """
+    expires_at = str(int(time.time()) + ttl_seconds)
+    return f"{expires_at}.{_signature(expires_at)}"
+
+
+def verify_profile_token(token: str) -> bool:
+    """Check a token made by sign_profile_token."""
+    if not settings.PROFILING_SECRET:
+        return False
+    expires_at, _, signature = token.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(expires_at))
+
+
+def _signature(expires_at: str) -> str:
+    return hmac.new(
+        settings.PROFILING_SECRET.encode(),
+        expires_at.encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+class ProfileSession:
+    """Profilers collected for one request, across threads."""
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable[..., Any], args, kwargs) -> Any:
+        """Run fn under a profiler of the current thread."""
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self.profilers.append(profiler)
+
+
+current_profile: ContextVar[Optional[ProfileSession]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def profile_threadpool_calls(app: FastAPI) -> None:
+    """Let profiled requests capture their threadpool work.
+
+    cProfile only sees the thread it was enabled on, while sync
+    endpoints and dependencies run on the threadpool. This wraps every
+    plain sync endpoint and dependency so that, during a profiled
+    request, each call runs under its own profiler, later merged into
+    the request's profile. Generator dependencies are left alone.
+    Call after all routers are included.
+
+    Args:
+        app: Application whose routes to wrap.
+    """
+    wrapped: Dict[Callable, Callable] = {}
+
+    def wrap(fn: Callable) -> Callable:
+        if fn not in wrapped:
+
+            @functools.wraps(fn)
+            def profiled(*args: Any, **kwargs: Any) -> Any:
+                session = current_profile.get()
+                if session is None:
+                    return fn(*args, **kwargs)
+                return session.run(fn, args, kwargs)
+
+            wrapped[fn] = profiled
+        return wrapped[fn]
+
+    def visit(dependant) -> None:
+        call = dependant.call
+        if (
+            call is not None
+            and inspect.isfunction(call)
+            and not inspect.iscoroutinefunction(call)
+            and not inspect.isgeneratorfunction(call)
+            and not inspect.isasyncgenfunction(call)
+        ):
+            dependant.call = wrap(call)
+        for sub_dependant in dependant.dependencies:
+            visit(sub_dependant)
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            visit(route.dependant)
+
+
+class ProfilingMiddleware:
+    """Profile sampled or explicitly requested HTTP requests.
+
+    A request is profiled with probability PROFILING_SAMPLE_RATE, or
+    when it carries a valid X-Profile-Token (see sign_profile_token).
+    The event loop thread is profiled for the whole request, merged
+    with its threadpool calls (see profile_threadpool_calls), and
+    written as a pstats file to PROFILING_DIR, named after the route;
+    the response's X-Profile-Id header names the file. Load it with
+    pstats, snakeviz or flameprof.
+
+    Only one request profiles the event loop at a time, and that
+    profile also sees any other coroutines running meanwhile. The
+    middleware is only installed when PROFILING_ENABLED is set, so it
+    costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.directory = settings.PROFILING_DIR
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.max_files = settings.PROFILING_MAX_FILES
+        self._loop_busy = False
+        os.makedirs(self.directory, exist_ok=True)
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession()
+        name = None
+        loop_profiler = None
+        if not self._loop_busy:
+            self._loop_busy = True
+            loop_profiler = cProfile.Profile()
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal name
+            if message["type"] == "http.response.start":
+                name = self.profile_name(scope, started)
+                MutableHeaders(scope=message)["X-Profile-Id"] = name
+            await send(message)
+
+        token = current_profile.set(session)
+        started = time.perf_counter()
+        if loop_profiler is not None:
+            loop_profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if loop_profiler is not None:
+                loop_profiler.disable()
+                self._loop_busy = False
+                session.profilers.append(loop_profiler)
+            current_profile.reset(token)
+            await run_sync(
+                self.save,
+                session,
+                name or self.profile_name(scope, started),
+            )
+
+    def should_profile(self, scope: Scope) -> bool:
+        """Decide whether to profile a request."""
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        for key, value in scope["headers"]:
+            if key == PROFILE_HEADER.encode():
+                return verify_profile_token(value.decode("latin-1"))
+        return False
+
+    @staticmethod
+    def profile_name(scope: Scope, started: float) -> str:
+        """Name a profile after its time, method and route."""
+        route = getattr(scope.get("route"), "path", "unmatched")
+        slug = re.sub(r"[^\w]+", "_", route).strip("_") or "root"
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        return (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-"
+            f"{time.time_ns() % 1_000_000:06d}-{scope['method']}-"
+            f"{slug}-{elapsed_ms}ms.prof"
+        )
+
+    def save(self, session: ProfileSession, name: str) -> None:
+        """Merge a request's profilers into one file and prune."""
+        profilers = [
+            p for p in session.profilers if p.getstats()
+        ]
+        if not profilers:
+            return
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(os.path.join(self.directory, name))
+
+        for old in list_profiles(self.directory)[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, old["name"]))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory: str) -> List[Dict[str, Any]]:
+    """List saved profiles, newest first.
+
+    Args:
+        directory: Directory profiles are written to.
+
+    Returns:
+        List[Dict[str, Any]]: Name, size in bytes and modification
+        time of each profile.
+    """
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if PROFILE_NAME_PATTERN.match(entry.name) and entry.is_file():
+            info = entry.stat()
+            profiles.append(
+                {
+                    "name": entry.name,
+                    "size": info.st_size,
+                    "modified": info.st_mtime,
+                }
+            )
+    return sorted(profiles, key=lambda p: p["modified"], reverse=True)
@@ -0,0 +1,100 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database.instrumentation import QueryStats, track_queries
+from app.utils.exceptions import QueryBudgetExceededError
+
+logger = logging.getLogger(__name__)
+
+
+def route_key(scope: Scope) -> str:
+    """Name the route that handled a request, e.g. "GET /posts/".
+
+    Uses the route's path template so every post ID shares a budget;
+    falls back to the raw path when no route matched.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope["path"]
+    return f"{scope['method']} {path}"
+
+
+class SQLStatsMiddleware:
+    """Attribute SQL statements and DB time to each HTTP request.
+
+    Checks run as the response starts, once the endpoint has done its
+    database work:
+
+    - a warning is logged for any statement repeated
+      SQL_DUPLICATE_WARN_THRESHOLD times, the signature of an N+1;
+    - a request over its SQL_QUERY_BUDGETS entry is logged, or raises
+      QueryBudgetExceededError when SQL_QUERY_BUDGET_STRICT is set;
+    - with SQL_STATS_DEBUG the totals are logged and returned in the
+      X-DB-Query-Count and X-DB-Time-Ms headers.
+
+    Statements run while a streaming body is produced are not counted.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    self.check(scope, stats)
+                    if settings.SQL_STATS_DEBUG:
+                        headers = MutableHeaders(scope=message)
+                        headers["X-DB-Query-Count"] = str(stats.count)
+                        headers["X-DB-Time-Ms"] = (
+                            f"{stats.duration * 1000:.2f}"
+                        )
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+    @staticmethod
+    def check(scope: Scope, stats: QueryStats) -> None:
+        """Log totals, duplicates and budget overruns of a request.
+
+        Raises:
+            QueryBudgetExceededError: If the request is over budget
+                and SQL_QUERY_BUDGET_STRICT is set.
+        """
+        key = route_key(scope)
+        if settings.SQL_STATS_DEBUG:
+            logger.info(
+                "%s ran %d SQL statements in %.2fms",
+                key,
+                stats.count,
+                stats.duration * 1000,
+            )
+
+        threshold = settings.SQL_DUPLICATE_WARN_THRESHOLD
+        if threshold > 0:
+            for statement, count in stats.duplicates(threshold):
+                logger.warning(
+                    "%s ran the same SQL %d times (possible N+1): %s",
+                    key,
+                    count,
+                    statement,
+                )
+
+        budget = settings.SQL_QUERY_BUDGETS.get(key)
+        if budget is not None and stats.count > budget:
+            message = (
+                f"{key} ran {stats.count} SQL statements, "
+                f"budget is {budget}"
+            )
+            if settings.SQL_QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceededError(message)
+            logger.error(message)
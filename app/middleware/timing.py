@@ -0,0 +1,75 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.middleware.metrics import UNMATCHED_ROUTE
+from app.utils.timing import RequestTimings, current_timings
+
+access_logger = logging.getLogger("app.access")
+
+
+class ServerTimingMiddleware:
+    """Break each request's latency down into phases.
+
+    Services and dependencies mark their phases (jwt, auth, cache, db,
+    serialize) with app.utils.timing; the rest is reported as app.
+    With SERVER_TIMING_HEADER the breakdown up to the response start
+    is sent in a Server-Timing header. Once the response is complete,
+    an access log line is written to the "app.access" logger with the
+    breakdown as structured fields in its ``extra``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.header = settings.SERVER_TIMING_HEADER
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    MutableHeaders(scope=message)["Server-Timing"] = (
+                        timings.server_timing()
+                    )
+            await send(message)
+
+        token = current_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            if access_logger.isEnabledFor(logging.INFO):
+                self.log(scope, status, timings)
+
+    @staticmethod
+    def log(scope: Scope, status: int, timings: RequestTimings) -> None:
+        """Write the access log line of a finished request."""
+        phases = timings.breakdown()
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+        access_logger.info(
+            "%s %s %d %.2fms",
+            scope["method"],
+            scope["path"],
+            status,
+            phases["total"],
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route,
+                "status": status,
+                "duration_ms": phases.pop("total"),
+                "phases_ms": phases,
+            },
+        )
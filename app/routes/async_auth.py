@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+)
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.session import get_async_db
+from app.schemas.auth import Token, UserCreate
+from app.services.auth import AsyncAuthService, AuthService
+from app.utils.exceptions import (
+    AuthenticationError,
+    HashingUnavailableError,
+    UserAlreadyExistsError,
+)
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post(
+    "/signup",
+    response_model=Token,
+    status_code=status.HTTP_201_CREATED,
+)
+async def signup(
+    user_data: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Endpoint for user registration."""
+    try:
+        user = await AsyncAuthService.create_user(db, user_data)
+        access_token = AuthService.create_access_token(
+            data={"sub": str(user.id)},
+            expires_delta=timedelta(
+                minutes=settings.JWT_EXPIRE_MINUTES
+            ),
+        )
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "user": user,
+        }
+    except UserAlreadyExistsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except HashingUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Endpoint for user login.
+
+    Args:
+        form_data: Login form data (username=email, password).
+        db: Async database session.
+
+    Returns:
+        Token: JWT access token.
+
+    Raises:
+        HTTPException: If authentication fails or hashing is
+            saturated.
+    """
+    try:
+        user = await AsyncAuthService.authenticate_user(
+            db,
+            email=form_data.username,
+            password=form_data.password,
+        )
+        access_token = AuthService.create_access_token(
+            data={"sub": str(user.id)},
+            expires_delta=timedelta(
+                minutes=settings.JWT_EXPIRE_MINUTES
+            ),
+        )
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "user": user,
+        }
+    except AuthenticationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except HashingUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,166 @@
+from functools import partial
+from typing import Optional
+
+from anyio.to_thread import run_sync
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import session as database
+from app.database.routing import use_primary
+from app.database.session import get_async_db
+from app.dependencies.auth import (
+    Principal,
+    get_current_principal_async,
+    validate_post_size,
+)
+from app.middleware.compression import compress
+from app.routes.posts import (
+    decode_after_id,
+    not_modified,
+    not_modified_response,
+    page_cache_key,
+    page_encoding,
+    page_etag,
+    page_response,
+)
+from app.schemas import PostCreate, PostPage, PostResponse
+from app.services import AsyncPostService, CacheService, PostService
+from app.utils.exceptions import (
+    PostNotFoundError,
+    UnauthorizedError,
+)
+
+router = APIRouter(prefix="/posts", tags=["posts"])
+
+
+@router.post(
+    "/",
+    response_model=PostResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_post(
+    request: Request,
+    post_data: PostCreate,
+    user: Principal = Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db),
+    _: None = Depends(validate_post_size),
+):
+    """Endpoint to create a new post.
+
+    Args:
+        request: FastAPI request object.
+        post_data: Post creation data.
+        user: Authenticated user.
+        db: Async database session.
+
+    Returns:
+        PostResponse: Created post data.
+    """
+    post = await AsyncPostService.create_post(
+        db, text=post_data.text, owner_id=user.id
+    )
+    return post
+
+
+@router.get("/", response_model=PostPage)
+async def get_posts(
+    request: Request,
+    limit: int = Query(
+        settings.POSTS_PAGE_SIZE,
+        ge=1,
+        le=settings.POSTS_MAX_PAGE_SIZE,
+        description="Maximum number of posts to return.",
+    ),
+    after_id: Optional[str] = Query(
+        None,
+        description="Cursor from a previous page's next_cursor.",
+    ),
+    user: Principal = Depends(get_current_principal_async),
+):
+    """Endpoint to get a page of posts for the current user.
+
+    Args:
+        request: FastAPI request object.
+        limit: Page size.
+        after_id: Opaque cursor to resume after.
+        user: Authenticated user.
+
+    Returns:
+        PostPage: Page of the user's posts, served from the cached
+        JSON body when available, or 304 Not Modified without a body
+        when If-None-Match carries the page's current ETag.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    after = decode_after_id(after_id)
+    user_id = user.id
+    key = await CacheService.arun(
+        page_cache_key, user_id, limit, after
+    )
+    etag = page_etag(key)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
+    async def load() -> bytes:
+        # A stale-while-revalidate refresh outlives the request, so
+        # the load runs in a session of its own, on the primary like
+        # the sync loader.
+        async with database.AsyncSessionLocal() as db:
+            use_primary(db)
+            posts, next_after_id = (
+                await AsyncPostService.get_user_posts_page(
+                    db, user_id=user_id, limit=limit, after_id=after
+                )
+            )
+        return PostService.encode_page(posts, next_after_id)
+
+    body = await CacheService.aget_or_load(key, load)
+    encoding = page_encoding(request, body)
+    if encoding is not None:
+        body = await CacheService.aget_or_load(
+            f"{key}:{encoding}",
+            partial(run_sync, compress, body, encoding),
+        )
+    return page_response(body, etag, encoding)
+
+
+@router.delete(
+    "/{post_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_post(
+    post_id: int,
+    user: Principal = Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Endpoint to delete a post.
+
+    Args:
+        post_id: ID of the post to delete.
+        user: Authenticated user.
+        db: Async database session.
+
+    Raises:
+        HTTPException: If post not found or unauthorized.
+    """
+    try:
+        await AsyncPostService.delete_post(
+            db, post_id=post_id, user_id=user.id
+        )
+    except (PostNotFoundError, UnauthorizedError) as e:
+        raise HTTPException(
+            status_code=(
+                status.HTTP_404_NOT_FOUND
+                if isinstance(e, PostNotFoundError)
+                else status.HTTP_403_FORBIDDEN
+            ),
+            detail=str(e),
+        )
@@ -15,6 +15,7 @@ from app.schemas.auth import Token, UserCreate
 from app.services.auth import AuthService
 from app.utils.exceptions import (
     AuthenticationError,
+    HashingUnavailableError,
     UserAlreadyExistsError,
 )
 
@@ -26,12 +27,16 @@ router = APIRouter(prefix="/auth", tags=["auth"])
     response_model=Token,
     status_code=status.HTTP_201_CREATED,
 )
-def signup(
+async def signup(
     user_data: UserCreate, db: Session = Depends(get_db)
 ):
-    """Endpoint for user registration."""
+    """Endpoint for user registration.
+
+    Declared async so that a signup waiting for a hashing worker
+    does not hold a threadpool thread; see AuthService.acreate_user.
+    """
     try:
-        user = AuthService.create_user(db, user_data)
+        user = await AuthService.acreate_user(db, user_data)
         access_token = AuthService.create_access_token(
             data={"sub": str(user.id)},
             expires_delta=timedelta(
@@ -48,15 +53,24 @@ def signup(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    except HashingUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
     """Endpoint for user login.
 
+    Declared async so that a login waiting for a hashing worker does
+    not hold a threadpool thread; see AuthService.aauthenticate_user.
+
     Args:
         form_data: Login form data (username=email, password).
         db: Database session.
@@ -65,10 +79,11 @@ def login(
         Token: JWT access token.
 
     Raises:
-        HTTPException: If authentication fails.
+        HTTPException: If authentication fails or hashing is
+            saturated.
     """
     try:
-        user = AuthService.authenticate_user(
+        user = await AuthService.aauthenticate_user(
             db,
             email=form_data.username,
             password=form_data.password,
@@ -90,3 +105,9 @@ def login(
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HashingUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
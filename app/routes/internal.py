@@ -0,0 +1,83 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.database.pool import pool_stats
+from app.database.session import (
+    async_engine,
+    async_replica_engines,
+    engine,
+    replica_engines,
+)
+from app.dependencies.auth import verify_internal_token
+from app.middleware.profiling import PROFILE_NAME_PATTERN, list_profiles
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(verify_internal_token)],
+    include_in_schema=False,
+)
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Endpoint reporting database connection pool metrics.
+
+    Declared async so it answers on the event loop even when the
+    worker threadpool is saturated.
+
+    Returns:
+        dict: Stats of the sync pool, and of the async pool when
+        DATABASE_ASYNC is enabled, each followed by its replicas'.
+    """
+    return {
+        "sync": pool_stats(engine.pool),
+        "sync_replicas": [pool_stats(e.pool) for e in replica_engines],
+        "async": (
+            pool_stats(async_engine.sync_engine.pool)
+            if async_engine is not None
+            else None
+        ),
+        "async_replicas": [
+            pool_stats(e.sync_engine.pool)
+            for e in async_replica_engines
+        ],
+    }
+
+
+@router.get("/profiles")
+def list_saved_profiles():
+    """Endpoint listing profiles saved by ProfilingMiddleware.
+
+    Returns:
+        list: Name, size in bytes and modification time of each
+        profile, newest first.
+    """
+    return list_profiles(settings.PROFILING_DIR)
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    """Endpoint downloading one saved profile.
+
+    Args:
+        name: File name, as listed or sent in X-Profile-Id.
+
+    Returns:
+        FileResponse: The pstats file.
+
+    Raises:
+        HTTPException: If no such profile exists.
+    """
+    path = os.path.join(settings.PROFILING_DIR, name)
+    if not PROFILE_NAME_PATTERN.match(name) or not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    return FileResponse(
+        path, media_type="application/octet-stream", filename=name
+    )
@@ -0,0 +1,217 @@
+from typing import List
+
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.database.pool import PoolMetricsMixin
+from app.database.session import engine
+from app.dependencies.auth import verify_internal_token
+from app.middleware.metrics import counter, gauge, metrics_registry
+from app.services import CacheService
+from app.utils.security import password_hasher, token_cache
+
+router = APIRouter(
+    tags=["metrics"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_internal_token)],
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def cache_metrics() -> List[str]:
+    """Render CacheService counters and hit ratio."""
+    stats = CacheService.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return [
+        *counter(
+            "cache_hits_total",
+            "CacheService lookups that found a value.",
+            [("", stats["hits"])],
+        ),
+        *counter(
+            "cache_misses_total",
+            "CacheService lookups that found nothing.",
+            [("", stats["misses"])],
+        ),
+        *gauge(
+            "cache_hit_ratio",
+            "Share of CacheService lookups that hit.",
+            [("", stats["hits"] / lookups if lookups else 0)],
+        ),
+        *counter(
+            "cache_coalesced_total",
+            "Loads that waited on another caller's load.",
+            [("", stats.get("coalesced", 0))],
+        ),
+        *counter(
+            "cache_stale_hits_total",
+            "Stale values served while refreshing.",
+            [("", stats.get("stale_hits", 0))],
+        ),
+        *gauge(
+            "cache_bytes",
+            "Estimated bytes held by the local cache.",
+            [("", stats.get("bytes", 0))],
+        ),
+    ]
+
+
+def threadpool_metrics() -> List[str]:
+    """Render the occupancy of the threadpool running sync endpoints.
+
+    Must run on the event loop, which owns the limiter.
+    """
+    limiter = current_default_thread_limiter()
+    return [
+        *gauge(
+            "threadpool_threads_total",
+            "Threads available to sync endpoints and dependencies.",
+            [("", limiter.total_tokens)],
+        ),
+        *gauge(
+            "threadpool_threads_busy",
+            "Threads running sync endpoints and dependencies.",
+            [("", limiter.borrowed_tokens)],
+        ),
+        *gauge(
+            "threadpool_tasks_waiting",
+            "Calls queued for a free thread.",
+            [("", limiter.statistics().tasks_waiting)],
+        ),
+    ]
+
+
+def password_hashing_metrics() -> List[str]:
+    """Render queue depth and latency of the password hashing pool."""
+    stats = password_hasher.stats()
+    return [
+        *gauge(
+            "password_hash_workers",
+            "Threads hashing and verifying passwords.",
+            [("", stats["workers"])],
+        ),
+        *gauge(
+            "password_hash_queue_depth",
+            "Hashing calls waiting for a worker.",
+            [("", stats["queue_depth"])],
+        ),
+        *gauge(
+            "password_hash_running",
+            "Hashing calls in progress.",
+            [("", stats["running"])],
+        ),
+        *counter(
+            "password_hash_completed_total",
+            "Hashing calls finished.",
+            [("", stats["completed"])],
+        ),
+        *counter(
+            "password_hash_rejected_total",
+            "Hashing calls refused because the queue was full.",
+            [("", stats["rejected"])],
+        ),
+        *counter(
+            "password_hash_timeouts_total",
+            "Hashing calls that timed out waiting for a result.",
+            [("", stats["timeouts"])],
+        ),
+        *gauge(
+            "password_hash_wait_seconds_avg",
+            "Mean time a hashing call waited for a worker.",
+            [("", stats["avg_wait_ms"] / 1000)],
+        ),
+        *gauge(
+            "password_hash_seconds_avg",
+            "Mean time to hash or verify a password.",
+            [("", stats["avg_hash_ms"] / 1000)],
+        ),
+        *gauge(
+            "password_hash_seconds_max",
+            "Longest time to hash or verify a password.",
+            [("", stats["max_hash_ms"] / 1000)],
+        ),
+    ]
+
+
+def token_cache_metrics() -> List[str]:
+    """Render counters of the verified JWT cache."""
+    stats = token_cache.stats()
+    return [
+        *counter(
+            "jwt_cache_hits_total",
+            "Token decodes answered from the verified token cache.",
+            [("", stats["hits"])],
+        ),
+        *counter(
+            "jwt_cache_misses_total",
+            "Token decodes that verified the signature.",
+            [("", stats["misses"])],
+        ),
+        *gauge(
+            "jwt_cache_entries",
+            "Verified tokens currently cached.",
+            [("", stats["entries"])],
+        ),
+        *gauge(
+            "jwt_cache_revoked",
+            "Revoked tokens remembered until they expire.",
+            [("", stats["revoked"])],
+        ),
+    ]
+
+
+def db_pool_metrics() -> List[str]:
+    """Render occupancy of the primary database pool."""
+    pool = engine.pool
+    if not isinstance(pool, PoolMetricsMixin):
+        return []
+    stats = pool.stats()
+    return [
+        *gauge(
+            "db_pool_checked_out",
+            "Connections in use.",
+            [("", stats["checked_out"])],
+        ),
+        *gauge(
+            "db_pool_overflow",
+            "Connections open beyond the pool size.",
+            [("", stats["overflow"])],
+        ),
+        *counter(
+            "db_pool_timeouts_total",
+            "Checkouts that gave up waiting for a connection.",
+            [("", stats["timeouts"])],
+        ),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Endpoint exposing metrics in the Prometheus text format.
+
+    Guarded like the /internal endpoints: it answers 404 unless
+    INTERNAL_API_TOKEN is set, and 403 without a matching
+    X-Internal-Token header.
+
+    Declared async: it reads the request metrics and the threadpool
+    limiter on the event loop that owns them, and still answers when
+    the threadpool is saturated.
+
+    Returns:
+        PlainTextResponse: Request, cache, JWT cache, threadpool,
+        password hashing and database pool metrics of this worker
+        process.
+    """
+    lines = [
+        *metrics_registry.render(),
+        *cache_metrics(),
+        *token_cache_metrics(),
+        *threadpool_metrics(),
+        *password_hashing_metrics(),
+        *db_pool_metrics(),
+    ]
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE
+    )
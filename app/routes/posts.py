@@ -1,29 +1,52 @@
-from typing import List
+import hashlib
+from functools import partial
+from typing import Iterator, List, Optional
 
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Query,
     Request,
+    Response,
     status,
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database.models.users import User
-from app.database.session import get_db
+from app.config import settings
+from app.database.routing import use_primary
+from app.database.session import SessionLocal, get_db
 from app.dependencies.auth import (
-    get_current_user,
+    Principal,
+    get_current_principal,
+    validate_post_batch_size,
     validate_post_size,
 )
-from app.schemas import PostCreate, PostResponse
+from app.middleware.compression import compress, negotiate_encoding
+from app.schemas import (
+    PostBatchCreate,
+    PostBulkDelete,
+    PostBulkDeleteResponse,
+    PostCreate,
+    PostPage,
+    PostResponse,
+    PostSearchHit,
+    PostSearchPage,
+)
 from app.services import CacheService, PostService
 from app.utils.exceptions import (
+    InvalidCursorError,
     PostNotFoundError,
     UnauthorizedError,
 )
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+# Pages are per user and change on every write: let clients keep them
+# but revalidate with If-None-Match on each use.
+PAGE_CACHE_CONTROL = "private, no-cache"
+
 
 @router.post(
     "/",
@@ -33,7 +56,7 @@ router = APIRouter(prefix="/posts", tags=["posts"])
 def create_post(
     request: Request,
     post_data: PostCreate,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
     _: None = Depends(validate_post_size),
 ):
@@ -54,30 +77,319 @@ def create_post(
     return post
 
 
-@router.get("/", response_model=List[PostResponse])
+@router.post(
+    "/batch",
+    response_model=List[PostResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+def create_posts(
+    batch: PostBatchCreate,
+    user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+    _: None = Depends(validate_post_batch_size),
+):
+    """Endpoint to create several posts in one request.
+
+    Args:
+        batch: Posts to create.
+        user: Authenticated user.
+        db: Database session.
+
+    Returns:
+        List[PostResponse]: Created posts, in request order.
+    """
+    return PostService.create_posts(
+        db,
+        texts=[post.text for post in batch.posts],
+        owner_id=user.id,
+    )
+
+
+def decode_after_id(after_id: Optional[str]) -> Optional[int]:
+    """Decode the after_id query parameter of GET /posts/.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    if not after_id:
+        return None
+    try:
+        return PostService.decode_cursor(after_id)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+def page_cache_key(
+    user_id: int, limit: int, after_id: Optional[int]
+) -> str:
+    """Build the cache key of one page of a user's posts."""
+    namespace_key = CacheService.versioned_key(
+        PostService.cache_namespace(user_id)
+    )
+    return f"{namespace_key}:{limit}:{after_id or 0}"
+
+
+def page_etag(cache_key: str) -> str:
+    """Derive the ETag of a page from its cache key.
+
+    The key embeds the user's posts generation, which every create and
+    delete bumps, so the tag changes exactly when the page may have.
+    It is weak since it is not a digest of the body bytes.
+    """
+    digest = hashlib.blake2b(cache_key.encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Check whether If-None-Match already names the current ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque
+        for tag in header.split(",")
+    )
+
+
+def page_headers(etag: str) -> dict:
+    """Headers shared by every GET /posts/ response."""
+    return {
+        "ETag": etag,
+        "Cache-Control": PAGE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+
+def page_response(
+    body: bytes, etag: str, encoding: Optional[str] = None
+) -> Response:
+    """Build the GET /posts/ response for a JSON body.
+
+    Args:
+        body: JSON body, compressed when encoding is set.
+        etag: Page ETag.
+        encoding: Content coding of body, if any.
+    """
+    headers = page_headers(etag)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=body, media_type="application/json", headers=headers
+    )
+
+
+def not_modified_response(etag: str) -> Response:
+    """Build the 304 answering a matching If-None-Match."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=page_headers(etag),
+    )
+
+
+def page_encoding(request: Request, body: bytes) -> Optional[str]:
+    """Negotiate the content coding of a GET /posts/ body.
+
+    Compressed variants of a page are cached next to it, under the
+    same namespace generation, so each page is compressed once per
+    coding rather than on every request. CompressionMiddleware passes
+    them through untouched.
+
+    Args:
+        request: Request whose Accept-Encoding is negotiated.
+        body: Uncompressed page body.
+
+    Returns:
+        Optional[str]: Coding to cache and send, or None for identity.
+    """
+    if not settings.COMPRESSION_ENABLED or (
+        len(body) < settings.COMPRESSION_MIN_BYTES
+    ):
+        return None
+    return negotiate_encoding(request.headers.get("accept-encoding"))
+
+
+def _load_posts_page(
+    user_id: int, limit: int, after_id: Optional[int]
+) -> bytes:
+    """Load and encode a page of posts in a session of its own.
+
+    Cache loads may run after the request that triggered them has
+    finished, so they cannot borrow the request's session. They read
+    from the primary: a load usually follows a write that bumped the
+    namespace, and a lagging replica's page would otherwise be cached
+    under the new generation until it expires.
+    """
+    with SessionLocal() as db:
+        use_primary(db)
+        posts, next_after_id = PostService.get_user_posts_page(
+            db, user_id=user_id, limit=limit, after_id=after_id
+        )
+        return PostService.encode_page(posts, next_after_id)
+
+
+@router.get("/", response_model=PostPage)
 def get_posts(
     request: Request,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    limit: int = Query(
+        settings.POSTS_PAGE_SIZE,
+        ge=1,
+        le=settings.POSTS_MAX_PAGE_SIZE,
+        description="Maximum number of posts to return.",
+    ),
+    after_id: Optional[str] = Query(
+        None,
+        description="Cursor from a previous page's next_cursor.",
+    ),
+    user: Principal = Depends(get_current_principal),
 ):
-    """Endpoint to get all posts for the current user.
+    """Endpoint to get a page of posts for the current user.
 
     Args:
         request: FastAPI request object.
+        limit: Page size.
+        after_id: Opaque cursor to resume after.
+        user: Authenticated user.
+
+    Returns:
+        PostPage: Page of the user's posts, served from the cached
+        JSON body when available, or 304 Not Modified without a body
+        when If-None-Match carries the page's current ETag.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    after = decode_after_id(after_id)
+    key = page_cache_key(user.id, limit, after)
+    etag = page_etag(key)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    body = CacheService.get_or_load(
+        key, partial(_load_posts_page, user.id, limit, after)
+    )
+    encoding = page_encoding(request, body)
+    if encoding is not None:
+        body = CacheService.get_or_load(
+            f"{key}:{encoding}", partial(compress, body, encoding)
+        )
+    return page_response(body, etag, encoding)
+
+
+@router.get("/search", response_model=PostSearchPage)
+def search_posts(
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=256,
+        description="Words that must all appear in a post.",
+    ),
+    limit: int = Query(
+        settings.POSTS_PAGE_SIZE,
+        ge=1,
+        le=settings.POSTS_MAX_PAGE_SIZE,
+        description="Maximum number of posts to return.",
+    ),
+    offset: int = Query(
+        0,
+        ge=0,
+        le=settings.SEARCH_MAX_OFFSET,
+        description="Number of matches to skip; use next_offset.",
+    ),
+    user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """Endpoint to search the current user's posts.
+
+    Args:
+        q: Search query.
+        limit: Page size.
+        offset: Matches to skip.
         user: Authenticated user.
         db: Database session.
 
     Returns:
-        List[PostResponse]: List of user's posts.
+        PostSearchPage: Matching posts ranked by relevance.
+    """
+    hits, next_offset = PostService.search_posts(
+        db, user_id=user.id, query=q, limit=limit, offset=offset
+    )
+    return PostSearchPage(
+        items=[
+            PostSearchHit(
+                id=post.id,
+                text=post.text,
+                owner_id=post.owner_id,
+                rank=rank,
+            )
+            for post, rank in hits
+        ],
+        next_offset=next_offset,
+    )
+
+
+def _stream_posts_export(user_id: int) -> Iterator[bytes]:
+    """Stream a user's posts from a session owned by the stream.
+
+    The body is produced after the endpoint has returned, so the
+    stream opens and closes its own session.
+    """
+    with SessionLocal() as db:
+        yield from PostService.export_user_posts(
+            db,
+            user_id=user_id,
+            batch_size=settings.POSTS_EXPORT_BATCH_SIZE,
+        )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+    },
+)
+def export_posts(user: Principal = Depends(get_current_principal)):
+    """Endpoint to export all of the current user's posts.
+
+    Args:
+        user: Authenticated user.
+
+    Returns:
+        StreamingResponse: NDJSON stream, one PostResponse per line.
     """
-    cache_key = f"user_posts_{user.id}"
-    cached_data = CacheService.get(cache_key)
-    if cached_data:
-        return cached_data
+    return StreamingResponse(
+        _stream_posts_export(user.id),
+        media_type="application/x-ndjson",
+    )
 
-    posts = PostService.get_user_posts(db, user_id=user.id)
-    CacheService.set(cache_key, posts)
-    return posts
+
+@router.delete("/", response_model=PostBulkDeleteResponse)
+def delete_posts(
+    post_data: PostBulkDelete,
+    user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """Endpoint to delete several posts in one request.
+
+    Posts that don't exist or belong to someone else are skipped.
+
+    Args:
+        post_data: IDs of the posts to delete.
+        user: Authenticated user.
+        db: Database session.
+
+    Returns:
+        PostBulkDeleteResponse: Number of posts deleted.
+    """
+    deleted = PostService.delete_posts(
+        db, post_ids=post_data.post_ids, user_id=user.id
+    )
+    return PostBulkDeleteResponse(deleted=deleted)
 
 
 @router.delete(
@@ -85,7 +397,7 @@ def get_posts(
 )
 def delete_post(
     post_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Endpoint to delete a post.
@@ -102,9 +414,6 @@ def delete_post(
         PostService.delete_post(
             db, post_id=post_id, user_id=user.id
         )
-        cache_key = f"user_posts_{user.id}"
-        _ = CacheService.delete(cache_key, post_id)
-
     except (PostNotFoundError, UnauthorizedError) as e:
         raise HTTPException(
             status_code=(
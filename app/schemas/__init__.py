@@ -1,2 +1,12 @@
 from .auth import Token, UserCreate
-from .posts import PostCreate, PostDelete, PostResponse
+from .posts import (
+    PostBatchCreate,
+    PostBulkDelete,
+    PostBulkDeleteResponse,
+    PostCreate,
+    PostDelete,
+    PostPage,
+    PostResponse,
+    PostSearchHit,
+    PostSearchPage,
+)
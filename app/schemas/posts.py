@@ -1,5 +1,9 @@
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
+from app.config import settings
+
 
 class PostCreate(BaseModel):
     """Schema for creating a new post."""
@@ -12,6 +16,17 @@ class PostCreate(BaseModel):
     )
 
 
+class PostBatchCreate(BaseModel):
+    """Schema for creating several posts at once."""
+
+    posts: List[PostCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.POSTS_BATCH_MAX_ITEMS,
+        description="Posts to create, in order.",
+    )
+
+
 class PostResponse(BaseModel):
     """Schema for post response."""
 
@@ -26,9 +41,60 @@ class PostResponse(BaseModel):
     )
 
 
+class PostPage(BaseModel):
+    """Schema for one page of a user's posts."""
+
+    items: List[PostResponse] = Field(
+        ..., description="Posts on this page, ordered by ID."
+    )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor for the next page, if any.",
+    )
+
+
+class PostSearchHit(PostResponse):
+    """Schema for one post matching a search."""
+
+    rank: float = Field(
+        ..., description="Relevance of the match; higher is better."
+    )
+
+
+class PostSearchPage(BaseModel):
+    """Schema for one page of search results."""
+
+    items: List[PostSearchHit] = Field(
+        ..., description="Matching posts, best first."
+    )
+    next_offset: Optional[int] = Field(
+        None,
+        description="Offset of the next page, if any.",
+    )
+
+
 class PostDelete(BaseModel):
     """Schema for deleting a post."""
 
     post_id: int = Field(
         ..., description="ID of the post to delete."
     )
+
+
+class PostBulkDelete(BaseModel):
+    """Schema for deleting several posts at once."""
+
+    post_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.POSTS_BATCH_MAX_ITEMS,
+        description="IDs of the posts to delete.",
+    )
+
+
+class PostBulkDeleteResponse(BaseModel):
+    """Schema for the result of a bulk delete."""
+
+    deleted: int = Field(
+        ..., description="Number of posts deleted."
+    )
@@ -1,3 +1,4 @@
-from .auth import AuthService
+from .auth import AsyncAuthService, AuthService
 from .cache import CacheService
-from .posts import PostService
+from .posts import AsyncPostService, PostService
+from .search import SearchService
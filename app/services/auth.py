@@ -1,26 +1,74 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
+from anyio.to_thread import run_sync
 from jose import jwt
-from passlib.context import CryptContext
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.database.models import User
+from app.database.session import ainsert_returning, insert_returning
 from app.schemas.auth import UserCreate
+from app.services.cache import MemoryCacheBackend
 from app.utils.exceptions import (
     AuthenticationError,
     UserAlreadyExistsError,
 )
+from app.utils.security import password_hasher
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"], deprecated="auto"
-)
+# Unique index SQLAlchemy creates for ``User.email``.
+EMAIL_UNIQUE_INDEX = "ix_users_email"
+SQLITE_DUPLICATE_EMAIL = "UNIQUE constraint failed: users.email"
+MYSQL_DUPLICATE_ENTRY = 1062
 
 
 class AuthService:
     """Service handling authentication-related operations."""
 
+    _user_cache = MemoryCacheBackend(
+        max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+        max_bytes=settings.AUTH_USER_CACHE_MAX_ENTRIES * 1024,
+    )
+
+    @classmethod
+    def get_cached_user(cls, user_id: str) -> Optional[User]:
+        """Get an authenticated user from the principal cache.
+
+        Args:
+            user_id: The token's ``sub`` claim.
+
+        Returns:
+            Optional[User]: Detached user, or None on a miss.
+        """
+        return cls._user_cache.get(str(user_id))
+
+    @classmethod
+    def cache_user(cls, user: User) -> None:
+        """Remember a detached user for AUTH_USER_CACHE_SECONDS.
+
+        Args:
+            user: User loaded for the current request.
+        """
+        cls._user_cache.set(
+            str(user.id), user, settings.AUTH_USER_CACHE_SECONDS
+        )
+
+    @classmethod
+    def invalidate_user(cls, user_id: int) -> None:
+        """Drop a user from the principal cache.
+
+        Called automatically when a User row is updated or deleted
+        through the ORM; bulk UPDATE/DELETE statements bypass those
+        hooks and must call this explicitly.
+
+        Args:
+            user_id: ID of the changed user.
+        """
+        cls._user_cache.delete(str(user_id))
+
     @staticmethod
     def verify_password(
         plain_password: str, hashed_password: str
@@ -33,8 +81,11 @@ class AuthService:
 
         Returns:
             bool: True if passwords match, False otherwise.
+
+        Raises:
+            HashingUnavailableError: If the hashing pool is saturated.
         """
-        return pwd_context.verify(
+        return password_hasher.verify(
             plain_password, hashed_password
         )
 
@@ -47,8 +98,11 @@ class AuthService:
 
         Returns:
             str: The hashed password.
+
+        Raises:
+            HashingUnavailableError: If the hashing pool is saturated.
         """
-        return pwd_context.hash(password)
+        return password_hasher.hash(password)
 
     @staticmethod
     def create_access_token(
@@ -95,11 +149,7 @@ class AuthService:
         Raises:
             AuthenticationError: If authentication fails.
         """
-        user = (
-            db.query(User)
-            .filter(User.email == email)
-            .first()
-        )
+        user = cls.get_user_by_email(db, email)
         if not user or not cls.verify_password(
             password, user.password_hash
         ):
@@ -108,6 +158,53 @@ class AuthService:
             )
         return user
 
+    @classmethod
+    async def aauthenticate_user(
+        cls, db: Session, email: str, password: str
+    ) -> User:
+        """Authenticate a user from the event loop.
+
+        The lookup runs in the threadpool, but the bcrypt check is
+        awaited on the hashing pool, so a call waiting for a hashing
+        worker does not hold a threadpool thread.
+
+        Args:
+            db: Database session.
+            email: User's email.
+            password: User's password.
+
+        Returns:
+            User: The authenticated user.
+
+        Raises:
+            AuthenticationError: If authentication fails.
+        """
+        user = await run_sync(cls.get_user_by_email, db, email)
+        if not user or not await password_hasher.averify(
+            password, user.password_hash
+        ):
+            raise AuthenticationError(
+                "Incorrect email or password"
+            )
+        return user
+
+    @staticmethod
+    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+        """Get a user by email.
+
+        Args:
+            db: Database session.
+            email: User's email.
+
+        Returns:
+            Optional[User]: The user, or None if there is none.
+        """
+        return (
+            db.query(User)
+            .filter(User.email == email)
+            .first()
+        )
+
     @classmethod
     def create_user(
         cls, db: Session, user_data: UserCreate
@@ -124,24 +221,189 @@ class AuthService:
         Raises:
             UserAlreadyExistsError: If user with email already exists.
         """
-        existing_user = (
-            db.query(User)
-            .filter(User.email == user_data.email)
-            .first()
+        hashed_password = cls.get_password_hash(
+            user_data.password
         )
-        if existing_user:
-            raise UserAlreadyExistsError(
-                "User with this email already exists"
-            )
+        return cls.insert_user(db, user_data.email, hashed_password)
 
-        hashed_password = cls.get_password_hash(
+    @classmethod
+    async def acreate_user(
+        cls, db: Session, user_data: UserCreate
+    ) -> User:
+        """Create a new user from the event loop.
+
+        The password is hashed on the hashing pool without holding a
+        threadpool thread; only the INSERT runs in the threadpool.
+
+        Args:
+            db: Database session.
+            user_data: User creation data.
+
+        Returns:
+            User: The created user.
+
+        Raises:
+            UserAlreadyExistsError: If user with email already exists.
+        """
+        hashed_password = await password_hasher.ahash(
             user_data.password
         )
-        user = User(
-            email=user_data.email,
-            password_hash=hashed_password,
+        return await run_sync(
+            cls.insert_user, db, user_data.email, hashed_password
         )
-        db.add(user)
+
+    @classmethod
+    def insert_user(
+        cls, db: Session, email: str, password_hash: str
+    ) -> User:
+        """Insert and commit a user whose password is already hashed.
+
+        Args:
+            db: Database session.
+            email: User's email.
+            password_hash: Hash of the user's password.
+
+        Returns:
+            User: The created user.
+
+        Raises:
+            UserAlreadyExistsError: If user with email already exists.
+        """
+        try:
+            user = insert_returning(
+                db,
+                User,
+                email=email,
+                password_hash=password_hash,
+            )
+        except IntegrityError as e:
+            db.rollback()
+            raise cls.integrity_error(e)
         db.commit()
-        db.refresh(user)
+        return user
+
+    @staticmethod
+    def integrity_error(error: IntegrityError) -> Exception:
+        """Translate a failed user INSERT into a domain error.
+
+        The unique constraint on ``users.email`` is the duplicate
+        check, so concurrent signups cannot both get through.
+
+        Args:
+            error: Error raised by the INSERT.
+
+        Returns:
+            Exception: UserAlreadyExistsError for a duplicate email,
+            otherwise the original error.
+        """
+        if AuthService.is_duplicate_email(error):
+            return UserAlreadyExistsError(
+                "User with this email already exists"
+            )
+        return error
+
+    @staticmethod
+    def is_duplicate_email(error: IntegrityError) -> bool:
+        """Check whether an error violated the unique email index.
+
+        PostgreSQL drivers name the violated index (psycopg on
+        ``diag``, asyncpg on the wrapped exception); SQLite and MySQL
+        only name it in a fixed-format message.
+
+        Args:
+            error: Error raised by the INSERT.
+
+        Returns:
+            bool: True for a duplicate ``users.email``.
+        """
+        orig = error.orig
+        for source in (
+            getattr(orig, "diag", None),
+            getattr(orig, "__cause__", None),
+        ):
+            name = getattr(source, "constraint_name", None)
+            if name is not None:
+                return name == EMAIL_UNIQUE_INDEX
+        args = getattr(orig, "args", ())
+        if len(args) == 2 and args[0] == MYSQL_DUPLICATE_ENTRY:
+            return str(args[1]).endswith(
+                (
+                    f"for key '{EMAIL_UNIQUE_INDEX}'",
+                    f"for key 'users.{EMAIL_UNIQUE_INDEX}'",
+                )
+            )
+        return str(orig) == SQLITE_DUPLICATE_EMAIL
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    AuthService.invalidate_user(target.id)
+
+
+class AsyncAuthService:
+    """Service handling authentication on an AsyncSession.
+
+    bcrypt is CPU-bound, so hashing is awaited on the password hashing
+    pool rather than run on the event loop.
+    """
+
+    @staticmethod
+    async def authenticate_user(
+        db: AsyncSession, email: str, password: str
+    ) -> User:
+        """Authenticate a user.
+
+        Args:
+            db: Async database session.
+            email: User's email.
+            password: User's password.
+
+        Returns:
+            User: The authenticated user.
+
+        Raises:
+            AuthenticationError: If authentication fails.
+        """
+        user = await db.scalar(
+            select(User).where(User.email == email)
+        )
+        if not user or not await password_hasher.averify(
+            password, user.password_hash
+        ):
+            raise AuthenticationError(
+                "Incorrect email or password"
+            )
+        return user
+
+    @staticmethod
+    async def create_user(
+        db: AsyncSession, user_data: UserCreate
+    ) -> User:
+        """Create a new user.
+
+        Args:
+            db: Async database session.
+            user_data: User creation data.
+
+        Returns:
+            User: The created user.
+
+        Raises:
+            UserAlreadyExistsError: If user with email already exists.
+        """
+        hashed_password = await password_hasher.ahash(
+            user_data.password
+        )
+        try:
+            user = await ainsert_returning(
+                db,
+                User,
+                email=user_data.email,
+                password_hash=hashed_password,
+            )
+        except IntegrityError as e:
+            await db.rollback()
+            raise AuthService.integrity_error(e)
+        await db.commit()
         return user
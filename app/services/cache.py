@@ -1,32 +1,542 @@
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+import asyncio
+import heapq
+import json
+import logging
+import struct
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from anyio.to_thread import run_sync
 
 from app.config import settings
+from app.utils.timing import timed
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Estimate the memory footprint of a cached value.
+
+    Args:
+        value: Value to measure.
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 3 or isinstance(value, (str, bytes, bytearray)):
+        return size
+    if isinstance(value, dict):
+        items = [*value.keys(), *value.values()]
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    elif hasattr(value, "__dict__"):
+        # Skip SQLAlchemy's per-instance state, which is shared
+        # bookkeeping rather than cached payload.
+        items = [
+            item
+            for name, item in vars(value).items()
+            if not name.startswith("_sa_")
+        ]
+    else:
+        return size
+    return size + sum(
+        estimate_size(item, _depth + 1) for item in items
+    )
+
+
+class CacheBackend:
+    """Interface implemented by cache engines behind CacheService."""
+
+    # Whether calls may wait on network I/O; CacheService.arun then
+    # keeps them off the event loop.
+    blocking = False
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, expire_seconds: int) -> None:
+        """Store value under key for expire_seconds."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        """Drop key. Returns True if an entry was removed."""
+        raise NotImplementedError
+
+    def incr(
+        self, key: str, amount: int, initial: int, expire_seconds: int
+    ) -> int:
+        """Atomically add amount to an integer counter.
+
+        A missing counter is created with ``initial`` (``amount`` is
+        not applied) and returned.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters."""
+        raise NotImplementedError
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Bounded in-process LRU cache with monotonic-clock TTLs.
+
+    Entries are evicted least-recently-used first once either
+    ``max_entries`` or ``max_bytes`` is exceeded. Expired entries are
+    swept from an expiry heap on every write, so keys that are never
+    read again do not linger until they fall off the LRU end.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, expire_seconds: int) -> None:
+        size = estimate_size(value)
+        with self._lock:
+            self._set(key, value, size, expire_seconds, self._clock())
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def incr(
+        self, key: str, amount: int, initial: int, expire_seconds: int
+    ) -> int:
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                entry.value += amount
+                self._entries.move_to_end(key)
+                return entry.value
+            # Seed under the same lock, like SET NX, so a racing seed
+            # from an older clock reading cannot replace this one.
+            self._set(
+                key, initial, estimate_size(initial), expire_seconds, now
+            )
+            return initial
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _set(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        expire_seconds: int,
+        now: float,
+    ) -> None:
+        """Store an entry; caller must hold the lock."""
+        if key in self._entries:
+            self._remove(key)
+        if expire_seconds <= 0 or size > self.max_bytes:
+            return
+        expires_at = now + expire_seconds
+        self._entries[key] = _Entry(value, expires_at, size)
+        self._bytes += size
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        self._sweep(now)
+        while (
+            len(self._entries) > self.max_entries
+            or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries; caller must hold the lock."""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self._expirations += 1
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                (entry.expires_at, key)
+                for key, entry in self._entries.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+
+class TwoTierCacheBackend(CacheBackend):
+    """Local L1 cache in front of a shared Redis-protocol L2.
+
+    Reads are served from L1 when possible and fall back to L2,
+    populating L1 on the way. Every write is published on a pub/sub
+    channel so the other workers drop their L1 copy of the key; the
+    short L1 TTL bounds staleness if a message is ever missed. When L2
+    is unreachable the backend degrades to L1 only.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        l1: MemoryCacheBackend,
+        client: Any,
+        channel: str,
+        l1_expire_seconds: int,
+        key_prefix: str = "",
+    ):
+        self.l1 = l1
+        self.client = client
+        self.channel = channel
+        self.l1_expire_seconds = l1_expire_seconds
+        self.key_prefix = key_prefix
+        self.node_id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._l2_hits = 0
+        self._misses = 0
+        self._subscriber = None
+
+    def start(self) -> None:
+        """Start listening for invalidations from other workers."""
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(**{self.channel: self._on_invalidation})
+        except Exception:
+            logger.warning(
+                "Cache invalidation subscribe failed", exc_info=True
+            )
+            return
+        self._subscriber = pubsub.run_in_thread(
+            sleep_time=0.01, daemon=True
+        )
+
+    def stop(self) -> None:
+        """Stop the invalidation listener."""
+        if self._subscriber is not None:
+            self._subscriber.stop()
+            self._subscriber = None
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        try:
+            pipe = self.client.pipeline()
+            pipe.get(self.key_prefix + key)
+            pipe.pttl(self.key_prefix + key)
+            raw, ttl_ms = pipe.execute()
+        except Exception:
+            logger.warning("L2 cache read failed", exc_info=True)
+            raw = None
+        if raw is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        value = _decode(raw)
+        with self._lock:
+            self._l2_hits += 1
+        if ttl_ms and ttl_ms > 0:
+            self.l1.set(
+                key,
+                value,
+                min(self.l1_expire_seconds, ttl_ms / 1000),
+            )
+        return value
+
+    def set(self, key: str, value: Any, expire_seconds: int) -> None:
+        self.l1.set(
+            key, value, min(self.l1_expire_seconds, expire_seconds)
+        )
+        try:
+            if expire_seconds > 0:
+                self.client.set(
+                    self.key_prefix + key,
+                    _encode(value),
+                    ex=expire_seconds,
+                )
+            else:
+                self.client.delete(self.key_prefix + key)
+        except Exception:
+            logger.warning("L2 cache write failed", exc_info=True)
+        self._publish(key)
+
+    def delete(self, key: str) -> bool:
+        removed = self.l1.delete(key)
+        try:
+            removed = bool(
+                self.client.delete(self.key_prefix + key)
+            ) or removed
+        except Exception:
+            logger.warning("L2 cache delete failed", exc_info=True)
+        self._publish(key)
+        return removed
+
+    def incr(
+        self, key: str, amount: int, initial: int, expire_seconds: int
+    ) -> int:
+        if amount == 0:
+            value = self.l1.get(key)
+            if value is not None:
+                return value
+        try:
+            if self.client.set(
+                self.key_prefix + key,
+                initial,
+                nx=True,
+                ex=expire_seconds,
+            ):
+                value = initial
+            elif amount:
+                value = self.client.incrby(
+                    self.key_prefix + key, amount
+                )
+            else:
+                value = int(self.client.get(self.key_prefix + key))
+        except Exception:
+            logger.warning("L2 cache counter failed", exc_info=True)
+            return self.l1.incr(key, amount, initial, expire_seconds)
+        if amount:
+            self.l1.delete(key)
+            self._publish(key)
+        else:
+            self.l1.set(
+                key,
+                value,
+                min(self.l1_expire_seconds, expire_seconds),
+            )
+        return value
+
+    def clear(self) -> None:
+        self.l1.clear()
+        try:
+            keys = list(
+                self.client.scan_iter(match=self.key_prefix + "*")
+            )
+            if keys:
+                self.client.delete(*keys)
+        except Exception:
+            logger.warning("L2 cache clear failed", exc_info=True)
+
+    def stats(self) -> Dict[str, int]:
+        l1_stats = self.l1.stats()
+        with self._lock:
+            return {
+                **l1_stats,
+                "l1_hits": l1_stats["hits"],
+                "l2_hits": self._l2_hits,
+                "hits": l1_stats["hits"] + self._l2_hits,
+                "misses": self._misses,
+            }
+
+    def _publish(self, key: str) -> None:
+        try:
+            self.client.publish(
+                self.channel, f"{self.node_id}:{key}"
+            )
+        except Exception:
+            logger.warning(
+                "Cache invalidation broadcast failed", exc_info=True
+            )
+
+    def _on_invalidation(self, message: Dict[str, Any]) -> None:
+        node_id, _, key = message["data"].decode().partition(":")
+        if node_id != self.node_id:
+            self.l1.delete(key)
+
+
+class _Stamped(NamedTuple):
+    """A cached value with the wall-clock time it stops being fresh.
+
+    Stored by loads with a stale window, so one read tells both the
+    value and whether it needs a background refresh.
+    """
+
+    fresh_until: float
+    value: Any
+
+
+_STAMP = struct.Struct("!d")
+
+
+def _encode(value: Any) -> bytes:
+    """Serialize a value for L2; bytes are stored verbatim."""
+    if isinstance(value, _Stamped):
+        return (
+            b"s" + _STAMP.pack(value.fresh_until) + _encode(value.value)
+        )
+    if isinstance(value, bytes):
+        return b"b" + value
+    return b"j" + json.dumps(value).encode()
+
+
+def _decode(raw: bytes) -> Any:
+    """Reverse of _encode."""
+    if raw[:1] == b"s":
+        (fresh_until,) = _STAMP.unpack_from(raw, 1)
+        return _Stamped(fresh_until, _decode(raw[1 + _STAMP.size:]))
+    if raw[:1] == b"b":
+        return raw[1:]
+    return json.loads(raw[1:])
+
+
+def build_cache_backend() -> CacheBackend:
+    """Create the cache engine selected by ``CACHE_BACKEND``.
+
+    Returns:
+        CacheBackend: Memory-only or two-tier engine.
+    """
+    if settings.CACHE_BACKEND == "redis":
+        import redis
+
+        backend = TwoTierCacheBackend(
+            l1=MemoryCacheBackend(
+                max_entries=settings.CACHE_L1_MAX_ENTRIES,
+                max_bytes=settings.CACHE_MAX_BYTES,
+            ),
+            client=redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=(
+                    settings.REDIS_CONNECT_TIMEOUT_SECONDS
+                ),
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            ),
+            channel=settings.CACHE_INVALIDATION_CHANNEL,
+            l1_expire_seconds=settings.CACHE_L1_EXPIRE_SECONDS,
+            key_prefix=settings.CACHE_KEY_PREFIX,
+        )
+        backend.start()
+        return backend
+    return MemoryCacheBackend(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES,
+    )
+
+
+class _Flight:
+    """A load in progress that concurrent callers wait on."""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
 
 
 class CacheService:
     """Service handling in-memory caching."""
 
-    _cache: Dict[str, Dict[str, Any]] = {}
+    _backend: CacheBackend = build_cache_backend()
+    _flights: Dict[str, _Flight] = {}
+    _flights_lock = threading.Lock()
+    _refresh_executor = ThreadPoolExecutor(
+        max_workers=settings.CACHE_REFRESH_WORKERS,
+        thread_name_prefix="cache-refresh",
+    )
+    _counters: Dict[str, int] = {"coalesced": 0, "stale_hits": 0}
+    _async_flights: Dict[str, "asyncio.Future"] = {}
+    _async_refreshes: Set["asyncio.Task"] = set()
+
+    @classmethod
+    def configure(cls, backend: CacheBackend) -> None:
+        """Replace the cache engine.
+
+        Args:
+            backend: Cache engine to use for subsequent calls.
+        """
+        cls._backend = backend
 
     @classmethod
-    def get(cls, key: str) -> Optional[Dict[str, Any]]:
+    def get(cls, key: str) -> Optional[Any]:
         """Get cached data.
 
         Args:
             key: Cache key.
 
         Returns:
-            Optional[Dict]: Cached data if exists and not expired, else None.
+            Optional[Any]: Cached data if exists and not expired.
         """
-        cached_data = cls._cache.get(key)
-        if (
-            cached_data
-            and datetime.now() < cached_data["expires_at"]
-        ):
-            return cached_data["data"]
-        cls._cache.pop(key, None)
-        return None
+        value = cls._backend.get(key)
+        if isinstance(value, _Stamped):
+            return value.value
+        return value
 
     @classmethod
     def set(
@@ -39,17 +549,254 @@ class CacheService:
             data: Data to cache.
             expire_seconds: Cache expiration in seconds.
         """
-        expire_seconds = (
-            expire_seconds or settings.CACHE_EXPIRE_SECONDS
+        if expire_seconds is None:
+            expire_seconds = settings.CACHE_EXPIRE_SECONDS
+        cls._backend.set(key, data, expire_seconds)
+
+    @classmethod
+    @timed("cache")
+    def get_or_load(
+        cls,
+        key: str,
+        loader: Callable[[], Any],
+        expire_seconds: int = None,
+        stale_seconds: int = None,
+    ) -> Any:
+        """Get cached data, loading it once on a miss.
+
+        Concurrent misses for the same key are coalesced: one caller
+        runs ``loader`` and the others wait for its result. With a
+        stale window, an entry past ``expire_seconds`` keeps being
+        served for up to ``stale_seconds`` more while a single
+        background refresh runs. ``loader`` must therefore not depend
+        on request-scoped resources such as the request's session.
+
+        Args:
+            key: Cache key.
+            loader: Zero-argument callable producing the data.
+            expire_seconds: Freshness lifetime in seconds.
+            stale_seconds: Extra seconds stale data may be served.
+
+        Returns:
+            Any: Cached or freshly loaded data.
+        """
+        if expire_seconds is None:
+            expire_seconds = settings.CACHE_EXPIRE_SECONDS
+        if stale_seconds is None:
+            stale_seconds = settings.CACHE_STALE_SECONDS
+
+        value = cls._backend.get(key)
+        if isinstance(value, _Stamped):
+            if value.fresh_until <= time.time():
+                cls._count("stale_hits")
+                cls._refresh(key, loader, expire_seconds, stale_seconds)
+            return value.value
+        if value is not None:
+            return value
+
+        with cls._flights_lock:
+            flight = cls._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = cls._flights[key] = _Flight()
+        if leader:
+            return cls._run_flight(
+                key, flight, loader, expire_seconds, stale_seconds
+            )
+
+        cls._count("coalesced")
+        if not flight.event.wait(settings.CACHE_LOAD_TIMEOUT_SECONDS):
+            return loader()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    @classmethod
+    def _refresh(
+        cls,
+        key: str,
+        loader: Callable[[], Any],
+        expire_seconds: int,
+        stale_seconds: int,
+    ) -> None:
+        """Start a background reload unless one is already running."""
+        with cls._flights_lock:
+            if key in cls._flights:
+                return
+            flight = cls._flights[key] = _Flight()
+        cls._refresh_executor.submit(
+            cls._run_flight,
+            key,
+            flight,
+            loader,
+            expire_seconds,
+            stale_seconds,
+            False,
         )
-        cls._cache[key] = {
-            "data": data,
-            "expires_at": datetime.now()
-            + timedelta(seconds=expire_seconds),
-        }
 
     @classmethod
-    def delete(cls, key: str, post_id: str) -> None:
+    def _run_flight(
+        cls,
+        key: str,
+        flight: _Flight,
+        loader: Callable[[], Any],
+        expire_seconds: int,
+        stale_seconds: int,
+        reraise: bool = True,
+    ) -> Any:
+        """Run loader, store its result and release waiting callers."""
+        try:
+            flight.result = loader()
+            cls._backend.set(
+                key,
+                cls._stamp(flight.result, expire_seconds, stale_seconds),
+                expire_seconds + stale_seconds,
+            )
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            if reraise:
+                raise
+        finally:
+            with cls._flights_lock:
+                cls._flights.pop(key, None)
+            flight.event.set()
+
+    @classmethod
+    @timed("cache")
+    async def aget_or_load(
+        cls,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        expire_seconds: int = None,
+        stale_seconds: int = None,
+    ) -> Any:
+        """Async counterpart of get_or_load for event-loop callers.
+
+        Flights are tracked per event loop with futures, so waiting
+        callers never block the loop.
+
+        Args:
+            key: Cache key.
+            loader: Zero-argument coroutine function producing the data.
+            expire_seconds: Freshness lifetime in seconds.
+            stale_seconds: Extra seconds stale data may be served.
+
+        Returns:
+            Any: Cached or freshly loaded data.
+        """
+        if expire_seconds is None:
+            expire_seconds = settings.CACHE_EXPIRE_SECONDS
+        if stale_seconds is None:
+            stale_seconds = settings.CACHE_STALE_SECONDS
+
+        value = await cls.arun(cls._backend.get, key)
+        if isinstance(value, _Stamped):
+            if (
+                value.fresh_until <= time.time()
+                and key not in cls._async_flights
+            ):
+                cls._count("stale_hits")
+                future = cls._async_flights[key] = (
+                    asyncio.get_running_loop().create_future()
+                )
+                task = asyncio.create_task(
+                    cls._arun_flight(
+                        key,
+                        future,
+                        loader,
+                        expire_seconds,
+                        stale_seconds,
+                        False,
+                    )
+                )
+                cls._async_refreshes.add(task)
+                task.add_done_callback(cls._async_refreshes.discard)
+            return value.value
+        if value is not None:
+            return value
+
+        future = cls._async_flights.get(key)
+        if future is None:
+            future = cls._async_flights[key] = (
+                asyncio.get_running_loop().create_future()
+            )
+            return await cls._arun_flight(
+                key, future, loader, expire_seconds, stale_seconds
+            )
+
+        cls._count("coalesced")
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future),
+                settings.CACHE_LOAD_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            return await loader()
+
+    @classmethod
+    async def _arun_flight(
+        cls,
+        key: str,
+        future: "asyncio.Future",
+        loader: Callable[[], Awaitable[Any]],
+        expire_seconds: int,
+        stale_seconds: int,
+        reraise: bool = True,
+    ) -> Any:
+        """Run an async loader and resolve the flight's future."""
+        try:
+            result = await loader()
+            await cls.arun(
+                cls._backend.set,
+                key,
+                cls._stamp(result, expire_seconds, stale_seconds),
+                expire_seconds + stale_seconds,
+            )
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody is waiting.
+            future.exception()
+            if reraise:
+                raise
+        finally:
+            cls._async_flights.pop(key, None)
+
+    @staticmethod
+    def _stamp(value: Any, expire_seconds: int, stale_seconds: int) -> Any:
+        """Attach the freshness deadline when a stale window is set."""
+        if not stale_seconds:
+            return value
+        return _Stamped(time.time() + expire_seconds, value)
+
+    @classmethod
+    async def arun(cls, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call a function that uses the cache from the event loop.
+
+        With a backend doing network I/O (Redis) the call runs in the
+        threadpool so it does not stall the loop; in-process backends
+        are called inline, which is cheaper than the thread hop.
+
+        Args:
+            fn: Synchronous function reading or writing the cache.
+            *args: Positional arguments for fn.
+
+        Returns:
+            Any: Result of fn.
+        """
+        if not cls._backend.blocking:
+            return fn(*args)
+        return await run_sync(fn, *args)
+
+    @classmethod
+    def _count(cls, name: str) -> None:
+        with cls._flights_lock:
+            cls._counters[name] += 1
+
+    @classmethod
+    def delete(cls, key: str) -> None:
         """Delete cached data.
 
         Args:
@@ -58,7 +805,76 @@ class CacheService:
         Returns:
             None.
         """
-        cached_data = cls._cache.get(key)
-        if cached_data:
-            cached_data.pop(post_id, None)
+        cls._backend.delete(key)
         return None
+
+    @classmethod
+    def get_version(cls, namespace: str) -> int:
+        """Get the current generation of a cache namespace.
+
+        A namespace without a counter (never written, expired or
+        evicted) is seeded from the wall clock in nanoseconds, so a
+        re-created counter never repeats a generation handed out
+        before and stale entries stay unreachable.
+
+        Args:
+            namespace: Cache namespace, e.g. ``user_posts_1``.
+
+        Returns:
+            int: Current generation.
+        """
+        return cls._backend.incr(
+            f"{namespace}:version",
+            0,
+            time.time_ns(),
+            settings.CACHE_EXPIRE_SECONDS,
+        )
+
+    @classmethod
+    def versioned_key(cls, namespace: str) -> str:
+        """Build the cache key for the current namespace generation.
+
+        Args:
+            namespace: Cache namespace.
+
+        Returns:
+            str: Key that changes whenever the namespace is invalidated.
+        """
+        return f"{namespace}:v{cls.get_version(namespace)}"
+
+    @classmethod
+    def invalidate(cls, namespace: str) -> int:
+        """Invalidate every key derived from a namespace.
+
+        Bumps the namespace generation; entries stored under older
+        generations are never read again and age out of the LRU.
+
+        Args:
+            namespace: Cache namespace.
+
+        Returns:
+            int: New generation.
+        """
+        return cls._backend.incr(
+            f"{namespace}:version",
+            1,
+            time.time_ns(),
+            settings.CACHE_EXPIRE_SECONDS,
+        )
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop all cached data."""
+        cls._backend.clear()
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """Get cache counters.
+
+        Returns:
+            Dict[str, int]: Hits, misses, evictions, expirations,
+            entry count, byte usage, coalesced loads and stale hits.
+        """
+        with cls._flights_lock:
+            counters = dict(cls._counters)
+        return {**cls._backend.stats(), **counters}
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Coalesce concurrent single-row inserts into shared transactions.
+
+    Callers hand over the column values of one row and block until it
+    is committed. A background thread collects rows arriving within
+    ``window_seconds`` of the first, or until ``max_batch`` are
+    waiting, inserts them with one flush and commits once, so
+    concurrent writers share a commit (and its fsync) instead of each
+    paying for their own. Every caller gets back its own detached row.
+
+    If a shared transaction fails, its rows are retried one per
+    transaction so a single bad row only fails its own caller. Rows
+    whose caller gave up (a cancelled asubmit, a timed-out submit)
+    before the writer picked them up are dropped, not inserted.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        model: Type[Any],
+        window_seconds: float,
+        max_batch: int,
+        on_commit: Optional[Callable[[List[Any]], None]] = None,
+        timeout_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.model = model
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.on_commit = on_commit
+        self.timeout_seconds = timeout_seconds
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._retried = 0
+        self._max_batch_seen = 0
+
+    def submit(self, **values: Any) -> Any:
+        """Insert a row in the next group commit and wait for it.
+
+        Args:
+            **values: Column values of the new row.
+
+        Returns:
+            Any: The committed row as a detached object.
+
+        Raises:
+            TimeoutError: If the row is not committed within
+                timeout_seconds. A row still queued is then dropped.
+        """
+        future = self._enqueue(values)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    async def asubmit(self, **values: Any) -> Any:
+        """Async counterpart of submit.
+
+        A row still queued when its caller times out or is cancelled
+        is dropped.
+        """
+        future = self._enqueue(values)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                self.timeout_seconds,
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Commit everything already submitted and stop the writer."""
+        with self._thread_lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+    def stats(self) -> Dict[str, float]:
+        """Get batching counters.
+
+        Returns:
+            Dict[str, float]: Commits, rows, mean and largest batch
+            size, and rows retried on their own.
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "rows": self._rows,
+                "avg_batch": self._rows / (self._batches or 1),
+                "max_batch": self._max_batch_seen,
+                "retried": self._retried,
+            }
+
+    def _enqueue(self, values: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        with self._thread_lock:
+            # A writer thread that died is replaced rather than left
+            # holding rows nobody will ever commit.
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="group-commit",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._queue.put((values, future))
+        return future
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = []
+            self._claim(item, batch)
+            deadline = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                self._claim(item, batch)
+            if not batch:
+                continue
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Never let one batch end the writer thread.
+                logger.exception("Group commit failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    @staticmethod
+    def _claim(
+        item: Tuple[Dict[str, Any], Future],
+        batch: List[Tuple[Dict[str, Any], Future]],
+    ) -> None:
+        """Add a queued row to batch unless its caller gave up.
+
+        Once claimed, a future can no longer be cancelled, so the
+        writer can always resolve it.
+        """
+        if item[1].set_running_or_notify_cancel():
+            batch.append(item)
+
+    def _commit(
+        self, batch: List[Tuple[Dict[str, Any], Future]]
+    ) -> None:
+        try:
+            rows = self._insert([values for values, _ in batch])
+        except Exception:
+            logger.exception(
+                "Group commit of %d rows failed, retrying singly",
+                len(batch),
+            )
+            with self._lock:
+                self._retried += len(batch)
+            for values, future in batch:
+                try:
+                    row = self._insert([values])[0]
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                self._notify([row])
+                future.set_result(row)
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._rows += len(rows)
+            self._max_batch_seen = max(self._max_batch_seen, len(rows))
+        self._notify(rows)
+        for row, (_, future) in zip(rows, batch):
+            future.set_result(row)
+
+    def _notify(self, rows: List[Any]) -> None:
+        # Runs before callers are released, so e.g. cache invalidation
+        # is visible to their next read.
+        if self.on_commit is None:
+            return
+        try:
+            self.on_commit(rows)
+        except Exception:
+            logger.exception("Group commit callback failed")
+
+    def _insert(self, batch: List[Dict[str, Any]]) -> List[Any]:
+        with self.session_factory() as db:
+            rows = [self.model(**values) for values in batch]
+            db.add_all(rows)
+            db.flush()
+            for row in rows:
+                db.expunge(row)
+            db.commit()
+        return rows
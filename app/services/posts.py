@@ -1,26 +1,121 @@
+import base64
+import binascii
+import json
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from pydantic import TypeAdapter
+from sqlalchemy import Delete, Select, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.database.models import Post
-from app.schemas.posts import PostCreate, PostResponse
+from app.database.session import (
+    SessionLocal,
+    ainsert_returning,
+    insert_returning,
+)
+from app.schemas.posts import PostCreate, PostPage, PostResponse
+from app.services.cache import CacheService
+from app.services.group_commit import GroupCommitWriter
+from app.services.search import SearchService, tokenize
 from app.utils.exceptions import (
+    InvalidCursorError,
     PostNotFoundError,
     UnauthorizedError,
 )
+from app.utils.timing import timed
+
+post_page_adapter = TypeAdapter(PostPage)
 
 
 class PostService:
     """Service handling post-related operations."""
 
     @staticmethod
+    def cache_namespace(user_id: int) -> str:
+        """Get the cache namespace holding a user's posts.
+
+        Args:
+            user_id: ID of the user.
+
+        Returns:
+            str: Namespace passed to CacheService.
+        """
+        return f"user_posts_{user_id}"
+
+    @classmethod
+    def posts_created(cls, owner_id: int, posts: List[Post]) -> None:
+        """Publish committed posts to the cache and search index.
+
+        Args:
+            owner_id: Owner of the posts.
+            posts: Created posts.
+        """
+        version = CacheService.invalidate(cls.cache_namespace(owner_id))
+        SearchService.posts_created(owner_id, posts, version)
+
+    @classmethod
+    def posts_deleted(cls, owner_id: int, post_ids: List[int]) -> None:
+        """Publish committed deletes to the cache and search index.
+
+        Args:
+            owner_id: Owner of the posts.
+            post_ids: IDs of the deleted posts.
+        """
+        version = CacheService.invalidate(cls.cache_namespace(owner_id))
+        SearchService.posts_deleted(owner_id, post_ids, version)
+
+    @classmethod
+    def search_posts(
+        cls,
+        db: Session,
+        user_id: int,
+        query: str,
+        limit: int,
+        offset: int = 0,
+    ) -> Tuple[List[Tuple[Post, float]], Optional[int]]:
+        """Search a user's posts, best matches first.
+
+        Every term of the query must appear in a post. Only the first
+        SEARCH_MAX_TERMS terms are used.
+
+        Args:
+            db: Database session.
+            user_id: ID of the user.
+            query: Free-text query.
+            limit: Maximum number of posts to return.
+            offset: Number of matches to skip.
+
+        Returns:
+            Tuple[List[Tuple[Post, float]], Optional[int]]: Posts with
+            their rank, and the offset of the next page or None.
+        """
+        terms = tokenize(query)[: settings.SEARCH_MAX_TERMS]
+        if not terms:
+            return [], None
+        hits = SearchService.search(
+            db,
+            user_id,
+            terms,
+            limit + 1,
+            offset,
+            CacheService.get_version(cls.cache_namespace(user_id)),
+        )
+        next_offset = offset + limit if len(hits) > limit else None
+        return hits[:limit], next_offset
+
+    @classmethod
     def create_post(
-        db: Session, text: str, owner_id: int
+        cls, db: Session, text: str, owner_id: int
     ) -> Post:
         """Create a new post.
 
+        With POSTS_GROUP_COMMIT enabled the post is handed to
+        post_writer and committed together with concurrent posts, on
+        the writer's own session.
+
         Args:
             db: Database session.
             text: Content of the post.
@@ -29,12 +124,53 @@ class PostService:
         Returns:
             Post: The created post.
         """
-        post = Post(text=text, owner_id=owner_id)
-        db.add(post)
+        if post_writer is not None:
+            return post_writer.submit(text=text, owner_id=owner_id)
+        post = insert_returning(
+            db, Post, text=text, owner_id=owner_id
+        )
         db.commit()
-        db.refresh(post)
+        cls.posts_created(owner_id, [post])
         return post
 
+    @classmethod
+    def create_posts(
+        cls, db: Session, texts: List[str], owner_id: int
+    ) -> List[Post]:
+        """Create several posts in one transaction.
+
+        On backends that support it the rows go out as a single
+        multi-row INSERT ... RETURNING; elsewhere the ORM falls back
+        to batched inserts. RETURNING does not promise row order, and
+        asking SQLAlchemy to keep it makes SQLite insert one row at a
+        time, so the posts are put back in order by ID instead. They
+        are detached before commit, so reading them afterwards does
+        not reload each one.
+
+        Args:
+            db: Database session.
+            texts: Contents of the posts, in order.
+            owner_id: ID of the posts' owner.
+
+        Returns:
+            List[Post]: The created posts, in the order given.
+        """
+        rows = [{"text": text, "owner_id": owner_id} for text in texts]
+        if db.get_bind().dialect.insert_executemany_returning:
+            posts = sorted(
+                db.scalars(insert(Post).returning(Post), rows),
+                key=lambda post: post.id,
+            )
+        else:
+            posts = [Post(**row) for row in rows]
+            db.add_all(posts)
+            db.flush()
+        for post in posts:
+            db.expunge(post)
+        db.commit()
+        cls.posts_created(owner_id, posts)
+        return posts
+
     @staticmethod
     def get_user_posts(
         db: Session, user_id: int
@@ -55,11 +191,213 @@ class PostService:
         )
 
     @staticmethod
+    def get_user_posts_page(
+        db: Session,
+        user_id: int,
+        limit: int,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[Post], Optional[int]]:
+        """Get one page of a user's posts using keyset pagination.
+
+        Seeks on the (owner_id, id) index instead of using OFFSET, so
+        the cost of a page does not depend on how deep it is.
+
+        Args:
+            db: Database session.
+            user_id: ID of the user.
+            limit: Maximum number of posts to return.
+            after_id: Only return posts with a greater ID.
+
+        Returns:
+            Tuple[List[Post], Optional[int]]: Posts ordered by ID and
+            the ID to resume after, or None on the last page.
+        """
+        posts = db.scalars(
+            PostService.page_statement(user_id, limit, after_id)
+        ).all()
+        return PostService.split_page(posts, limit)
+
+    @staticmethod
+    def page_statement(
+        user_id: int, limit: int, after_id: Optional[int]
+    ) -> Select:
+        """Build the keyset query for one page of a user's posts.
+
+        Fetches one row beyond ``limit`` to tell whether another page
+        follows.
+
+        Args:
+            user_id: ID of the user.
+            limit: Page size.
+            after_id: Only select posts with a greater ID.
+
+        Returns:
+            Select: Query ordered by post ID.
+        """
+        statement = select(Post).where(Post.owner_id == user_id)
+        if after_id is not None:
+            statement = statement.where(Post.id > after_id)
+        return statement.order_by(Post.id).limit(limit + 1)
+
+    @staticmethod
+    def split_page(
+        posts: List[Post], limit: int
+    ) -> Tuple[List[Post], Optional[int]]:
+        """Trim the look-ahead row fetched by page_statement.
+
+        Args:
+            posts: Up to ``limit + 1`` posts ordered by ID.
+            limit: Page size.
+
+        Returns:
+            Tuple[List[Post], Optional[int]]: The page and the ID to
+            resume after, or None on the last page.
+        """
+        if len(posts) > limit:
+            return list(posts[:limit]), posts[limit - 1].id
+        return list(posts), None
+
+    @staticmethod
+    def export_user_posts(
+        db: Session, user_id: int, batch_size: int
+    ) -> Iterator[bytes]:
+        """Stream all of a user's posts as NDJSON chunks.
+
+        Rows are fetched ``batch_size`` at a time through a
+        server-side cursor where the driver supports one, and each
+        batch is encoded and yielded before the next is fetched, so
+        memory stays flat regardless of how many posts are exported.
+
+        Args:
+            db: Database session.
+            user_id: ID of the user.
+            batch_size: Rows fetched and encoded per chunk.
+
+        Yields:
+            bytes: One JSON object per line for each post in a batch.
+        """
+        result = db.execute(
+            select(Post.id, Post.text, Post.owner_id)
+            .where(Post.owner_id == user_id)
+            .order_by(Post.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            yield "".join(
+                json.dumps(
+                    {"id": id, "text": text, "owner_id": owner_id}
+                )
+                + "\n"
+                for id, text, owner_id in rows
+            ).encode()
+
+    @staticmethod
+    def encode_cursor(post_id: int) -> str:
+        """Encode a post ID as an opaque pagination cursor.
+
+        Args:
+            post_id: ID of the last post on a page.
+
+        Returns:
+            str: URL-safe cursor.
+        """
+        raw = str(post_id).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> int:
+        """Decode a cursor produced by encode_cursor.
+
+        Args:
+            cursor: Opaque pagination cursor.
+
+        Returns:
+            int: Post ID to resume after.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            return int(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, ValueError):
+            raise InvalidCursorError("Invalid pagination cursor")
+
+    @classmethod
+    @timed("serialize")
+    def encode_page(
+        cls, posts: List[Post], next_after_id: Optional[int]
+    ) -> bytes:
+        """Encode a page of posts into the JSON body of GET /posts/.
+
+        Args:
+            posts: Posts on the page.
+            next_after_id: ID to resume after, or None.
+
+        Returns:
+            bytes: JSON-encoded PostPage.
+        """
+        page = post_page_adapter.validate_python(
+            {
+                "items": posts,
+                "next_cursor": (
+                    cls.encode_cursor(next_after_id)
+                    if next_after_id is not None
+                    else None
+                ),
+            },
+            from_attributes=True,
+        )
+        return post_page_adapter.dump_json(page)
+
+    @staticmethod
+    def delete_statement(post_ids: List[int], user_id: int) -> Delete:
+        """Build a DELETE of the given posts owned by a user.
+
+        Ownership is part of the WHERE clause, so a single statement
+        both checks and deletes; rows owned by someone else are left
+        alone. The session is not synchronized, since nothing needs
+        the deleted objects afterwards.
+
+        Args:
+            post_ids: IDs of the posts to delete.
+            user_id: ID of the user attempting deletion.
+
+        Returns:
+            Delete: Statement whose rowcount is the number deleted.
+        """
+        return (
+            delete(Post)
+            .where(Post.id.in_(post_ids), Post.owner_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def ownership_error(owner_id: Optional[int]) -> Exception:
+        """Explain why a post could not be deleted.
+
+        Args:
+            owner_id: Owner of the post, or None if it doesn't exist.
+
+        Returns:
+            Exception: PostNotFoundError or UnauthorizedError.
+        """
+        if owner_id is None:
+            return PostNotFoundError("Post not found")
+        return UnauthorizedError(
+            "You don't have permission to delete this post"
+        )
+
+    @classmethod
     def delete_post(
-        db: Session, post_id: int, user_id: int
+        cls, db: Session, post_id: int, user_id: int
     ) -> None:
         """Delete a post.
 
+        Issues one ownership-checked DELETE; the post is only looked
+        up when nothing was deleted, to tell a missing post from one
+        owned by someone else.
+
         Args:
             db: Database session.
             post_id: ID of the post to delete.
@@ -69,17 +407,146 @@ class PostService:
             PostNotFoundError: If post doesn't exist.
             UnauthorizedError: If user doesn't own the post.
         """
-        post = (
-            db.query(Post)
-            .filter(Post.id == post_id)
-            .first()
-        )
-        if not post:
-            raise PostNotFoundError("Post not found")
-        if post.owner_id != user_id:
-            raise UnauthorizedError(
-                "You don't have permission to delete this post"
+        result = db.execute(cls.delete_statement([post_id], user_id))
+        if result.rowcount == 0:
+            owner_id = db.scalar(
+                select(Post.owner_id).where(Post.id == post_id)
             )
+            db.rollback()
+            raise cls.ownership_error(owner_id)
+
+        db.commit()
+        cls.posts_deleted(user_id, [post_id])
+
+    @classmethod
+    def delete_posts(
+        cls, db: Session, post_ids: List[int], user_id: int
+    ) -> int:
+        """Delete several of a user's posts in one statement.
+
+        IDs that don't exist or belong to someone else are skipped.
 
-        db.delete(post)
+        Args:
+            db: Database session.
+            post_ids: IDs of the posts to delete.
+            user_id: ID of the user attempting deletion.
+
+        Returns:
+            int: Number of posts deleted.
+        """
+        deleted = db.execute(
+            cls.delete_statement(post_ids, user_id)
+        ).rowcount
         db.commit()
+        if deleted:
+            cls.posts_deleted(user_id, post_ids)
+        return deleted
+
+
+def _posts_committed(posts: List[Post]) -> None:
+    by_owner: Dict[int, List[Post]] = {}
+    for post in posts:
+        by_owner.setdefault(post.owner_id, []).append(post)
+    for owner_id, owned in by_owner.items():
+        PostService.posts_created(owner_id, owned)
+
+
+post_writer = (
+    GroupCommitWriter(
+        SessionLocal,
+        Post,
+        window_seconds=settings.POSTS_GROUP_COMMIT_WINDOW_MS / 1000,
+        max_batch=settings.POSTS_GROUP_COMMIT_MAX_BATCH,
+        on_commit=_posts_committed,
+        timeout_seconds=settings.POSTS_GROUP_COMMIT_TIMEOUT_SECONDS,
+    )
+    if settings.POSTS_GROUP_COMMIT
+    else None
+)
+
+
+class AsyncPostService:
+    """Service handling post-related operations on an AsyncSession."""
+
+    @staticmethod
+    async def create_post(
+        db: AsyncSession, text: str, owner_id: int
+    ) -> Post:
+        """Create a new post.
+
+        Args:
+            db: Async database session.
+            text: Content of the post.
+            owner_id: ID of the post owner.
+
+        Returns:
+            Post: The created post.
+        """
+        if post_writer is not None:
+            return await post_writer.asubmit(
+                text=text, owner_id=owner_id
+            )
+        post = await ainsert_returning(
+            db, Post, text=text, owner_id=owner_id
+        )
+        await db.commit()
+        await CacheService.arun(
+            PostService.posts_created, owner_id, [post]
+        )
+        return post
+
+    @staticmethod
+    async def get_user_posts_page(
+        db: AsyncSession,
+        user_id: int,
+        limit: int,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[Post], Optional[int]]:
+        """Get one page of a user's posts using keyset pagination.
+
+        Args:
+            db: Async database session.
+            user_id: ID of the user.
+            limit: Maximum number of posts to return.
+            after_id: Only return posts with a greater ID.
+
+        Returns:
+            Tuple[List[Post], Optional[int]]: Posts ordered by ID and
+            the ID to resume after, or None on the last page.
+        """
+        posts = (
+            await db.scalars(
+                PostService.page_statement(user_id, limit, after_id)
+            )
+        ).all()
+        return PostService.split_page(posts, limit)
+
+    @staticmethod
+    async def delete_post(
+        db: AsyncSession, post_id: int, user_id: int
+    ) -> None:
+        """Delete a post.
+
+        Args:
+            db: Async database session.
+            post_id: ID of the post to delete.
+            user_id: ID of the user attempting deletion.
+
+        Raises:
+            PostNotFoundError: If post doesn't exist.
+            UnauthorizedError: If user doesn't own the post.
+        """
+        result = await db.execute(
+            PostService.delete_statement([post_id], user_id)
+        )
+        if result.rowcount == 0:
+            owner_id = await db.scalar(
+                select(Post.owner_id).where(Post.id == post_id)
+            )
+            await db.rollback()
+            raise PostService.ownership_error(owner_id)
+
+        await db.commit()
+        await CacheService.arun(
+            PostService.posts_deleted, user_id, [post_id]
+        )
@@ -0,0 +1,446 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    column,
+    func,
+    inspect,
+    literal_column,
+    select,
+    table,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.models import Post
+from app.database.routing import use_primary
+
+# Runs of letters and digits; matches how SQLite's unicode61 tokenizer
+# splits text, so every backend sees the same terms.
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+SearchHits = List[Tuple[Post, float]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchBackend:
+    """Interface of the full-text index behind SearchService."""
+
+    name = "base"
+
+    def setup(self, engine: Engine) -> None:
+        """Create whatever the index needs in the database."""
+
+    def search(
+        self,
+        db: Session,
+        user_id: int,
+        terms: Sequence[str],
+        limit: int,
+        offset: int,
+        version: int,
+    ) -> SearchHits:
+        """Find a user's posts containing every term, best first.
+
+        Args:
+            db: Database session.
+            user_id: Owner whose posts are searched.
+            terms: Terms from tokenize(); all must match.
+            limit: Maximum number of hits.
+            offset: Hits to skip.
+            version: Current generation of the user's posts.
+
+        Returns:
+            SearchHits: Posts and their ranks, higher is better.
+        """
+        raise NotImplementedError
+
+    def posts_created(
+        self, owner_id: int, posts: Sequence[Post], version: int
+    ) -> None:
+        """Index committed posts; version is the new generation."""
+
+    def posts_deleted(
+        self, owner_id: int, post_ids: Sequence[int], version: int
+    ) -> None:
+        """Unindex deleted posts; version is the new generation."""
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 index over the posts table.
+
+    An external-content FTS5 table indexes text and owner_id, kept in
+    sync by triggers, so every write path (including raw SQL and
+    cascading deletes) updates it in the same transaction. Queries
+    match the owner's token together with the terms, which lets FTS5
+    intersect posting lists instead of filtering every match, and are
+    ranked by bm25 on the text column.
+    """
+
+    name = "sqlite_fts5"
+    fts = table("posts_fts", column("rowid"))
+    DDL = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+        "text, owner_id, content='posts', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS posts_fts_insert "
+        "AFTER INSERT ON posts BEGIN "
+        "INSERT INTO posts_fts(rowid, text, owner_id) "
+        "VALUES (new.id, new.text, new.owner_id); END",
+        "CREATE TRIGGER IF NOT EXISTS posts_fts_delete "
+        "AFTER DELETE ON posts BEGIN "
+        "INSERT INTO posts_fts(posts_fts, rowid, text, owner_id) "
+        "VALUES ('delete', old.id, old.text, old.owner_id); END",
+        "CREATE TRIGGER IF NOT EXISTS posts_fts_update "
+        "AFTER UPDATE ON posts BEGIN "
+        "INSERT INTO posts_fts(posts_fts, rowid, text, owner_id) "
+        "VALUES ('delete', old.id, old.text, old.owner_id); "
+        "INSERT INTO posts_fts(rowid, text, owner_id) "
+        "VALUES (new.id, new.text, new.owner_id); END",
+    )
+
+    def setup(self, engine: Engine) -> None:
+        with engine.begin() as conn:
+            exists = inspect(conn).has_table("posts_fts")
+            for statement in self.DDL:
+                conn.exec_driver_sql(statement)
+            if not exists:
+                # Index posts written before the table existed.
+                conn.exec_driver_sql(
+                    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"
+                )
+
+    def search(self, db, user_id, terms, limit, offset, version):
+        match = " AND ".join(
+            [f'owner_id:"{int(user_id)}"']
+            + [f'text:"{term}"' for term in terms]
+        )
+        # bm25 is lower for better matches; weight 0 ignores owner_id.
+        score = func.bm25(literal_column("posts_fts"), 1.0, 0.0)
+        statement = (
+            select(Post, score)
+            .join(self.fts, self.fts.c.rowid == Post.id)
+            .where(literal_column("posts_fts").op("MATCH")(match))
+            .order_by(score, Post.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(post, -rank) for post, rank in db.execute(statement)]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector search backed by a GIN expression index.
+
+    The index is on to_tsvector(SEARCH_LANGUAGE, text), which
+    PostgreSQL maintains on every write; queries use the same
+    expression so the planner can combine it with the owner index.
+    Results are ranked with ts_rank.
+    """
+
+    name = "postgresql_tsvector"
+
+    def __init__(self, language: str):
+        if not re.fullmatch(r"\w+", language):
+            raise ValueError(f"Invalid search language: {language!r}")
+        self.config = literal_column(f"'{language}'::regconfig")
+        self.index_ddl = (
+            "CREATE INDEX IF NOT EXISTS ix_posts_text_search ON posts "
+            f"USING gin (to_tsvector('{language}'::regconfig, text))"
+        )
+
+    def setup(self, engine: Engine) -> None:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(self.index_ddl)
+
+    def search(self, db, user_id, terms, limit, offset, version):
+        document = func.to_tsvector(self.config, Post.text)
+        query = func.to_tsquery(self.config, " & ".join(terms))
+        rank = func.ts_rank(document, query)
+        statement = (
+            select(Post, rank)
+            .where(Post.owner_id == user_id, document.op("@@")(query))
+            .order_by(rank.desc(), Post.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(post, score) for post, score in db.execute(statement)]
+
+
+class _UserIndex:
+    """Inverted index of one user's posts."""
+
+    __slots__ = ("version", "postings", "documents", "total_terms")
+
+    def __init__(self, version: int):
+        self.version = version
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.documents: Dict[int, Tuple[int, Tuple[str, ...]]] = {}
+        self.total_terms = 0
+
+    def add(self, post_id: int, text: str) -> None:
+        terms = tokenize(text)
+        counts = Counter(terms)
+        for term, count in counts.items():
+            self.postings.setdefault(term, {})[post_id] = count
+        self.documents[post_id] = (len(terms), tuple(counts))
+        self.total_terms += len(terms)
+
+    def remove(self, post_id: int) -> None:
+        document = self.documents.pop(post_id, None)
+        if document is None:
+            return
+        length, terms = document
+        for term in terms:
+            posting = self.postings[term]
+            del posting[post_id]
+            if not posting:
+                del self.postings[term]
+        self.total_terms -= length
+
+    def search(
+        self, terms: Sequence[str], count: int
+    ) -> List[Tuple[float, int]]:
+        """Rank posts containing every term with BM25.
+
+        Candidates come from the shortest posting list, so the cost
+        follows the rarest term rather than the number of posts.
+        """
+        postings = [self.postings.get(term) for term in set(terms)]
+        if not postings or not all(postings):
+            return []
+        postings.sort(key=len)
+        total = len(self.documents)
+        average = self.total_terms / total
+        weights = [
+            (
+                posting,
+                math.log(
+                    1 + (total - len(posting) + 0.5) / (len(posting) + 0.5)
+                ),
+            )
+            for posting in postings
+        ]
+
+        def scored():
+            for post_id in postings[0]:
+                if not all(post_id in p for p in postings[1:]):
+                    continue
+                length = self.documents[post_id][0]
+                norm = 1.2 * (0.25 + 0.75 * length / average)
+                score = 0.0
+                for posting, idf in weights:
+                    frequency = posting[post_id]
+                    score += idf * frequency * 2.2 / (frequency + norm)
+                yield score, post_id
+
+        return heapq.nlargest(count, scored())
+
+
+class MemorySearchBackend(SearchBackend):
+    """In-process inverted index, for databases without one of ours.
+
+    Each user's index is built from the database on their first
+    search and tagged with the generation of their posts. Writes in
+    this process update it in place when it is exactly one generation
+    behind; any other change, such as a write by another worker
+    sharing the Redis cache, makes the next search rebuild it.
+    Indexes of the SEARCH_MEMORY_MAX_USERS most recent searchers are
+    kept.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._indexes: "OrderedDict[int, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(self, db, user_id, terms, limit, offset, version):
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None and index.version == version:
+                self._indexes.move_to_end(user_id)
+            else:
+                index = None
+        if index is None:
+            index = self._build(db, user_id, version)
+        with self._lock:
+            ranked = index.search(terms, offset + limit)[offset:]
+        if not ranked:
+            return []
+        posts = {
+            post.id: post
+            for post in db.scalars(
+                select(Post).where(
+                    Post.id.in_([post_id for _, post_id in ranked])
+                )
+            )
+        }
+        return [
+            (posts[post_id], score)
+            for score, post_id in ranked
+            if post_id in posts
+        ]
+
+    def _build(self, db: Session, user_id: int, version: int):
+        # The index is tagged with the current generation, so it must
+        # not be built from a replica that has not caught up with it.
+        use_primary(db)
+        index = _UserIndex(version)
+        rows = db.execute(
+            select(Post.id, Post.text).where(Post.owner_id == user_id)
+        )
+        for post_id, text in rows:
+            index.add(post_id, text)
+        with self._lock:
+            self._indexes[user_id] = index
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+        return index
+
+    def posts_created(self, owner_id, posts, version):
+        with self._lock:
+            index = self._current(owner_id, version)
+            if index is not None:
+                for post in posts:
+                    index.add(post.id, post.text)
+
+    def posts_deleted(self, owner_id, post_ids, version):
+        with self._lock:
+            index = self._current(owner_id, version)
+            if index is not None:
+                for post_id in post_ids:
+                    index.remove(post_id)
+
+    def _current(
+        self, owner_id: int, version: int
+    ) -> Optional[_UserIndex]:
+        """Advance a user's index to version, or drop it if stale."""
+        index = self._indexes.get(owner_id)
+        if index is None:
+            return None
+        if index.version != version - 1:
+            del self._indexes[owner_id]
+            return None
+        index.version = version
+        return index
+
+
+def build_search_backend(engine: Engine) -> SearchBackend:
+    """Pick the search index for a database.
+
+    With SEARCH_BACKEND "auto", SQLite builds with FTS5 get an FTS5
+    table and PostgreSQL a tsvector index; anything else, or
+    SEARCH_BACKEND "memory", uses the in-process index.
+
+    Args:
+        engine: Primary database engine.
+
+    Returns:
+        SearchBackend: Backend to configure SearchService with.
+    """
+    memory = MemorySearchBackend(settings.SEARCH_MEMORY_MAX_USERS)
+    if settings.SEARCH_BACKEND == "memory":
+        return memory
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        return PostgresSearchBackend(settings.SEARCH_LANGUAGE)
+    if dialect == "sqlite":
+        with engine.connect() as conn:
+            options = conn.exec_driver_sql(
+                "PRAGMA compile_options"
+            ).scalars()
+            if "ENABLE_FTS5" in set(options):
+                return SQLiteSearchBackend()
+    return memory
+
+
+class SearchService:
+    """Service handling full-text search over posts."""
+
+    _backend: SearchBackend = MemorySearchBackend(
+        settings.SEARCH_MEMORY_MAX_USERS
+    )
+
+    @classmethod
+    def configure(cls, backend: SearchBackend) -> None:
+        """Replace the search index.
+
+        Args:
+            backend: Index to use for subsequent calls.
+        """
+        cls._backend = backend
+
+    @classmethod
+    def setup(cls, engine: Engine) -> None:
+        """Select the index for a database and create it if needed.
+
+        Args:
+            engine: Primary database engine.
+        """
+        backend = build_search_backend(engine)
+        backend.setup(engine)
+        cls.configure(backend)
+
+    @classmethod
+    def search(
+        cls,
+        db: Session,
+        user_id: int,
+        terms: Sequence[str],
+        limit: int,
+        offset: int,
+        version: int,
+    ) -> SearchHits:
+        """Find a user's posts containing every term, best first.
+
+        Args:
+            db: Database session.
+            user_id: Owner whose posts are searched.
+            terms: Terms from tokenize(); all must match.
+            limit: Maximum number of hits.
+            offset: Hits to skip.
+            version: Current generation of the user's posts.
+
+        Returns:
+            SearchHits: Posts and their ranks, higher is better.
+        """
+        return cls._backend.search(
+            db, user_id, terms, limit, offset, version
+        )
+
+    @classmethod
+    def posts_created(
+        cls, owner_id: int, posts: Sequence[Post], version: int
+    ) -> None:
+        """Index committed posts.
+
+        Args:
+            owner_id: Owner of the posts.
+            posts: Created posts.
+            version: Generation of the owner's posts after the write.
+        """
+        cls._backend.posts_created(owner_id, posts, version)
+
+    @classmethod
+    def posts_deleted(
+        cls, owner_id: int, post_ids: Sequence[int], version: int
+    ) -> None:
+        """Unindex deleted posts.
+
+        Args:
+            owner_id: Owner of the posts.
+            post_ids: IDs of the deleted posts.
+            version: Generation of the owner's posts after the write.
+        """
+        cls._backend.posts_deleted(owner_id, post_ids, version)
@@ -28,6 +28,24 @@ class UnauthorizedError(AppException):
     pass
 
 
+class InvalidCursorError(AppException):
+    """Exception raised when a pagination cursor cannot be decoded."""
+
+    pass
+
+
+class HashingUnavailableError(AppException):
+    """Exception raised when password hashing is saturated or too slow."""
+
+    pass
+
+
+class QueryBudgetExceededError(AppException):
+    """Exception raised when a request runs more SQL than its budget."""
+
+    pass
+
+
 class SecurityException(AppException):
     """Exception raised for security issues."""
 
@@ -1,18 +1,288 @@
+import asyncio
+import hashlib
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.config import settings
-from app.utils.exceptions import SecurityException
+from app.utils.exceptions import (
+    HashingUnavailableError,
+    SecurityException,
+)
+from app.utils.timing import timed
 
 pwd_context = CryptContext(
     schemes=["bcrypt"], deprecated="auto"
 )
 
 
+class PasswordHashingPool:
+    """Bounded worker pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL, so a small thread pool gives real
+    parallelism while capping how many cores hashing can take. At most
+    ``workers + max_queue`` calls are admitted at once; beyond that,
+    and when a call waits longer than ``timeout``, callers get
+    HashingUnavailableError instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._wait_seconds = 0.0
+        self._hash_seconds = 0.0
+        self._max_hash_seconds = 0.0
+
+    def hash(self, password: str) -> str:
+        """Hash a password on the pool."""
+        return self.run(pwd_context.hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash on the pool."""
+        return self.run(
+            pwd_context.verify, plain_password, hashed_password
+        )
+
+    async def ahash(self, password: str) -> str:
+        """Hash a password on the pool without blocking the loop."""
+        return await self.arun(pwd_context.hash, password)
+
+    async def averify(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        """Verify a password on the pool without blocking the loop."""
+        return await self.arun(
+            pwd_context.verify, plain_password, hashed_password
+        )
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn on the pool and wait for its result.
+
+        Raises:
+            HashingUnavailableError: If the pool is saturated or the
+                call times out.
+        """
+        future = self._submit(fn, args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._timed_out(future)
+
+    async def arun(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Async counterpart of run."""
+        future = self._submit(fn, args)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                self.timeout,
+            )
+        except asyncio.TimeoutError:
+            self._timed_out(future)
+
+    def stats(self) -> Dict[str, float]:
+        """Get queue depth and latency counters.
+
+        Returns:
+            Dict[str, float]: Pool size, queued and running calls,
+            completed, rejected and timed-out calls, and mean queue
+            wait and hash latency in milliseconds.
+        """
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": self._wait_seconds / completed * 1000,
+                "avg_hash_ms": self._hash_seconds / completed * 1000,
+                "max_hash_ms": self._max_hash_seconds * 1000,
+            }
+
+    def _submit(self, fn: Callable[..., Any], args: tuple):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingUnavailableError(
+                "Password hashing is saturated, retry shortly"
+            )
+        with self._lock:
+            self._queued += 1
+        try:
+            future = self._executor.submit(
+                self._execute, fn, args, time.perf_counter()
+            )
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+        self._slots.release()
+
+    def _execute(
+        self, fn: Callable[..., Any], args: tuple, submitted: float
+    ) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_seconds += started - submitted
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._hash_seconds += elapsed
+                self._max_hash_seconds = max(
+                    self._max_hash_seconds, elapsed
+                )
+
+    def _timed_out(self, future) -> None:
+        # A queued call is dropped; a running one finishes unobserved.
+        future.cancel()
+        with self._lock:
+            self._timeouts += 1
+        raise HashingUnavailableError(
+            "Password hashing timed out, retry shortly"
+        )
+
+
+password_hasher = PasswordHashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+)
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified JWT claims.
+
+    Entries are keyed by a SHA-256 digest of the token, so raw tokens
+    are never held, and live until the token's ``exp`` claim. Revoked
+    digests are remembered until the token would have expired anyway.
+    Revocation is local to the process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = (
+            OrderedDict()
+        )
+        self._revoked: Dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """Key a token by its SHA-256 digest."""
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Get the claims of a previously verified, unexpired token."""
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, token: str, claims: dict) -> None:
+        """Remember verified claims until the token's expiry."""
+        expires_at = claims.get("exp")
+        if self.max_entries <= 0 or not expires_at:
+            return
+        key = self.digest(token)
+        with self._lock:
+            if key in self._revoked:
+                return
+            self._entries[key] = (float(expires_at), claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke(self, token: str, expires_at: float) -> None:
+        """Reject a token from now on, even though it verifies."""
+        key = self.digest(token)
+        with self._lock:
+            now = self._clock()
+            self._revoked = {
+                digest: exp
+                for digest, exp in self._revoked.items()
+                if exp > now
+            }
+            self._revoked[key] = expires_at
+            self._entries.pop(key, None)
+
+    def is_revoked(self, token: str) -> bool:
+        """Check whether a token has been revoked."""
+        if not self._revoked:
+            return False
+        with self._lock:
+            return self.digest(token) in self._revoked
+
+    def clear(self) -> None:
+        """Drop every cached token (revocations are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss, size and revocation counters."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+                "revoked": len(self._revoked),
+            }
+
+
+token_cache = VerifiedTokenCache(
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES
+)
+
+
 class SecurityUtils:
     """Utility class for security-related operations."""
 
@@ -61,7 +331,7 @@ class SecurityUtils:
         Returns:
             str: The hashed password
         """
-        return pwd_context.hash(password)
+        return password_hasher.hash(password)
 
     @staticmethod
     def verify_password(
@@ -76,7 +346,7 @@ class SecurityUtils:
         Returns:
             bool: True if passwords match
         """
-        return pwd_context.verify(
+        return password_hasher.verify(
             plain_password, hashed_password
         )
 
@@ -109,9 +379,13 @@ class SecurityUtils:
         )
 
     @staticmethod
+    @timed("jwt")
     def decode_token(token: str) -> dict:
         """Decode a JWT token.
 
+        Tokens that verified before are served from token_cache until
+        they expire, skipping signature verification and decoding.
+
         Args:
             token: The JWT token to decode
 
@@ -119,10 +393,15 @@ class SecurityUtils:
             dict: The decoded token payload
 
         Raises:
-            SecurityException: If token is invalid
+            SecurityException: If token is invalid or revoked
         """
+        claims = token_cache.get(token)
+        if claims is not None:
+            return claims
+        if token_cache.is_revoked(token):
+            raise SecurityException("Token has been revoked")
         try:
-            return jwt.decode(
+            claims = jwt.decode(
                 token,
                 settings.JWT_SECRET_KEY,
                 algorithms=[settings.JWT_ALGORITHM],
@@ -131,3 +410,18 @@ class SecurityUtils:
             raise SecurityException("Token has expired")
         except jwt.JWTError:
             raise SecurityException("Invalid token")
+        token_cache.put(token, claims)
+        return claims
+
+    @staticmethod
+    def revoke_token(token: str) -> None:
+        """Revoke a token for the rest of its lifetime.
+
+        Args:
+            token: The JWT token to revoke
+
+        Raises:
+            SecurityException: If token is invalid
+        """
+        claims = SecurityUtils.decode_token(token)
+        token_cache.revoke(token, float(claims.get("exp", 0)))
@@ -0,0 +1,144 @@
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+
+class RequestTimings:
+    """Time spent in each named phase of one request.
+
+    Phases are exclusive: time spent in a phase nested inside another
+    (say the database queries of a cache load) is only counted for
+    the inner one. Phases may be entered from threadpool calls, so
+    totals are updated under a lock.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add seconds to a phase."""
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    def breakdown(self) -> Dict[str, float]:
+        """Get phase durations in milliseconds, rounded.
+
+        Includes ``app``, the time not attributed to any phase
+        (routing, validation, response_model serialization, threadpool
+        hops), and ``total``, the time so far.
+        """
+        total = self.elapsed()
+        with self._lock:
+            phases = dict(self.phases)
+        phases["app"] = max(0.0, total - sum(phases.values()))
+        phases["total"] = total
+        return {name: round(s * 1000, 3) for name, s in phases.items()}
+
+    def server_timing(self) -> str:
+        """Format the breakdown as a Server-Timing header value."""
+        return ", ".join(
+            f"{name};dur={ms}" for name, ms in self.breakdown().items()
+        )
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+class _Frame:
+    __slots__ = ("nested",)
+
+    def __init__(self):
+        self.nested = 0.0
+
+
+_open_frame: ContextVar[Optional[_Frame]] = ContextVar(
+    "open_frame", default=None
+)
+
+
+class phase:
+    """Context manager timing a block as one phase of the request.
+
+    Does nothing outside a timed request, so services can use it
+    unconditionally.
+
+    Args:
+        name: Phase name, as shown in Server-Timing.
+    """
+
+    __slots__ = ("name", "timings", "frame", "token", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "phase":
+        self.timings = current_timings.get()
+        if self.timings is not None:
+            self.frame = _Frame()
+            self.token = _open_frame.set(self.frame)
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.timings is None:
+            return
+        elapsed = time.perf_counter() - self.started
+        _open_frame.reset(self.token)
+        self.timings.add(self.name, elapsed - self.frame.nested)
+        parent = _open_frame.get()
+        if parent is not None:
+            parent.nested += elapsed
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """Count time measured elsewhere, e.g. by a DB hook, as a phase.
+
+    Args:
+        name: Phase name.
+        seconds: Duration to add.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return
+    timings.add(name, seconds)
+    parent = _open_frame.get()
+    if parent is not None:
+        parent.nested += seconds
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a function or coroutine function to run as a phase.
+
+    Args:
+        name: Phase name.
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with phase(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,158 @@
+"""Compare the sync (threadpool) and async database paths.
+
+Each mode runs in its own interpreter, because ``DATABASE_ASYNC`` is
+read when the app is imported. The app is driven in-process through
+httpx's ASGI transport against a throwaway SQLite file, with the posts
+cache disabled so every request reaches the database.
+
+Usage:
+    python -m benchmarks.async_db [--requests N] [--concurrency C]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * fraction))
+    return ordered[index]
+
+
+async def drive(app, token, requests, concurrency):
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker(client):
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get("/posts/", headers=headers)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def drive_and_dispose(app, token, requests, concurrency):
+    from app.database.session import async_engine
+
+    try:
+        return await drive(app, token, requests, concurrency)
+    finally:
+        if async_engine is not None:
+            await async_engine.dispose()
+
+
+def run_worker(args):
+    from app.database.models import Post, User
+    from app.database.session import SessionLocal
+    from app.main import create_tables, get_application
+    from app.services.auth import AuthService
+
+    create_tables()
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.add_all(
+            Post(text=f"post {i}", owner_id=user.id)
+            for i in range(args.posts)
+        )
+        db.commit()
+        token = AuthService.create_access_token({"sub": str(user.id)})
+
+    result = asyncio.run(
+        drive_and_dispose(
+            get_application(),
+            token,
+            args.requests,
+            args.concurrency,
+        )
+    )
+    print(json.dumps(result))
+
+
+def run_mode(mode, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+            "DATABASE_ASYNC": "true" if mode == "async" else "false",
+            "CACHE_EXPIRE_SECONDS": "0",
+            "JWT_SECRET_KEY": os.environ.get(
+                "JWT_SECRET_KEY", "benchmark-secret"
+            ),
+        }
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.async_db",
+                "--worker",
+                "--requests",
+                str(args.requests),
+                "--concurrency",
+                str(args.concurrency),
+                "--posts",
+                str(args.posts),
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--worker", action="store_true")
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'mode':<6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for mode in ("sync", "async"):
+        r = run_mode(mode, args)
+        print(
+            f"{mode:<6} {r['rps']:>8} {r['p50_ms']:>7}ms "
+            f"{r['p95_ms']:>7}ms {r['p99_ms']:>7}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
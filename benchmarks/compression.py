@@ -0,0 +1,106 @@
+"""Measure the CPU-versus-bytes tradeoff of response compression.
+
+Encodes pages of GET /posts/ (``--posts`` posts of ``--post-chars``
+characters of pseudo-random English-like text) and compresses them
+with gzip and, when zstandard is installed, zstd at several levels.
+Reports the compressed size, ratio and compression time per page,
+next to the time to fetch an already compressed variant from the
+cache, which is what repeated requests for a cached page pay.
+
+Usage:
+    python -m benchmarks.compression [--posts N] [--post-chars C]
+        [--rounds R]
+"""
+import argparse
+import os
+import random
+import time
+import zlib
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+WORDS = (
+    "the post user feed api cache database request response latency "
+    "server client mobile page token query index write read stream "
+    "fast slow network bytes update delete create list search text"
+).split()
+
+
+def build_page(posts, post_chars):
+    from app.database.models import Post
+    from app.services import PostService
+
+    rng = random.Random(42)
+    items = []
+    for i in range(posts):
+        words, length = [], 0
+        while length < post_chars:
+            words.append(rng.choice(WORDS))
+            length += len(words[-1]) + 1
+        items.append(
+            Post(
+                id=i + 1,
+                text=" ".join(words)[:post_chars],
+                owner_id=1,
+            )
+        )
+    return PostService.encode_page(items, posts)
+
+
+def codecs():
+    yield "gzip-1", lambda body: _gzip(body, 1)
+    yield "gzip-6", lambda body: _gzip(body, 6)
+    yield "gzip-9", lambda body: _gzip(body, 9)
+    try:
+        import zstandard
+    except ImportError:
+        return
+    for level in (1, 3, 10):
+        compressor = zstandard.ZstdCompressor(level=level)
+        yield f"zstd-{level}", compressor.compress
+
+
+def _gzip(body, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def best_time(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    from app.services import CacheService
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--post-chars", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    body = build_page(args.posts, args.post_chars)
+    print(f"page of {args.posts} posts: {len(body)} bytes")
+    print(f"{'codec':<9} {'bytes':>9} {'ratio':>7} {'us/page':>9}")
+    for name, compress in codecs():
+        compressed = compress(body)
+        seconds = best_time(lambda: compress(body), args.rounds)
+        print(
+            f"{name:<9} {len(compressed):>9} "
+            f"{len(body) / len(compressed):>7.1f} {seconds * 1e6:>9.1f}"
+        )
+
+    CacheService.set("bench:page:gzip", _gzip(body, 6))
+    seconds = best_time(
+        lambda: CacheService.get("bench:page:gzip"), args.rounds
+    )
+    print(f"{'cached':<9} {'':>9} {'':>7} {seconds * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
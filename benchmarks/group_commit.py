@@ -0,0 +1,104 @@
+"""Compare per-request commits with the group-commit post writer.
+
+Concurrent writer threads insert posts into a throwaway SQLite file in
+WAL mode with ``synchronous=FULL``, so every commit pays for an fsync.
+In ``direct`` mode each post is committed by PostService.create_post on
+its own session; in ``group`` mode posts go through a
+GroupCommitWriter and share commits.
+
+Usage:
+    python -m benchmarks.group_commit [--posts N] [--concurrency C]
+        [--window-ms W] [--max-batch B]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+
+def make_session_factory(path, concurrency):
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import Base
+
+    engine = create_engine(
+        f"sqlite:///{path}",
+        pool_size=concurrency,
+        connect_args={"timeout": 30, "check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=FULL")
+        cursor.close()
+
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def run_mode(mode, args):
+    from app.database.models import Post
+    from app.services.group_commit import GroupCommitWriter
+    from app.services.posts import PostService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, Session = make_session_factory(
+            f"{tmp}/bench.db", args.concurrency
+        )
+        writer = GroupCommitWriter(
+            Session,
+            Post,
+            window_seconds=args.window_ms / 1000,
+            max_batch=args.max_batch,
+        )
+
+        def create(i):
+            if mode == "group":
+                return writer.submit(text=f"post {i}", owner_id=1)
+            with Session() as db:
+                return PostService.create_post(
+                    db, text=f"post {i}", owner_id=1
+                )
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            started = time.perf_counter()
+            list(pool.map(create, range(args.posts)))
+            elapsed = time.perf_counter() - started
+        writer.stop()
+        engine.dispose()
+
+    stats = writer.stats()
+    grouped = mode == "group"
+    return {
+        "posts_per_s": round(args.posts / elapsed, 1),
+        "commits": stats["batches"] if grouped else args.posts,
+        "avg_batch": round(stats["avg_batch"], 1) if grouped else 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--window-ms", type=float, default=2)
+    parser.add_argument("--max-batch", type=int, default=128)
+    args = parser.parse_args()
+
+    print(f"{'mode':<7} {'posts/s':>9} {'commits':>8} {'batch':>6}")
+    for mode in ("direct", "group"):
+        r = run_mode(mode, args)
+        print(
+            f"{mode:<7} {r['posts_per_s']:>9} {r['commits']:>8} "
+            f"{r['avg_batch']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
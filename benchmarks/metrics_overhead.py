@@ -0,0 +1,96 @@
+"""Measure the per-request cost of MetricsMiddleware.
+
+Calls a trivial endpoint through the raw ASGI interface, with and
+without the middleware, so the difference is the middleware alone
+rather than HTTP client or server work. Also times
+MetricsRegistry.observe on its own.
+
+Usage:
+    python -m benchmarks.metrics_overhead [--requests N] [--rounds R]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+
+def build_app(with_metrics):
+    from fastapi import FastAPI
+
+    from app.middleware import MetricsMiddleware
+    from app.middleware.metrics import MetricsRegistry
+
+    app = FastAPI()
+
+    @app.get("/posts/{post_id}")
+    async def get_post(post_id: int):
+        return {"id": post_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+    return app
+
+
+async def call(app, requests):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/posts/{i}",
+            "raw_path": f"/posts/{i}".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "server": ("bench", 80),
+            "client": ("bench", 1234),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def main():
+    from app.middleware.metrics import MetricsRegistry
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Alternate the two apps and keep each one's best round, so
+    # machine noise does not land on one side only.
+    apps = {"without": build_app(False), "with": build_app(True)}
+    results = {label: float("inf") for label in apps}
+    for _ in range(args.rounds):
+        for label, app in apps.items():
+            seconds = asyncio.run(call(app, args.requests))
+            results[label] = min(results[label], seconds)
+
+    registry = MetricsRegistry()
+    started = time.perf_counter()
+    for i in range(args.requests):
+        registry.observe("GET", "/posts/{post_id}", 200, i * 1e-5)
+    observe = (time.perf_counter() - started) / args.requests
+
+    print(f"{'middleware':<11} {'us/request':>11}")
+    for label, seconds in results.items():
+        print(f"{label:<11} {seconds * 1e6:>11.2f}")
+    overhead = results["with"] - results["without"]
+    print(f"overhead    {overhead * 1e6:>11.2f}")
+    print(f"observe()   {observe * 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Measure post search latency as a user's post count grows.
+
+Seeds a SQLite database with posts of random words and times
+PostService.search_posts for a rare and a common term with the FTS5
+and in-process backends, next to a LIKE scan of the same posts. Each
+query is timed warm: the in-process index is built on the first run.
+
+Usage:
+    python -m benchmarks.search [--counts 1000,10000,100000]
+        [--rounds R]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# Always a throwaway database: an exported or .env DATABASE_URL
+# (load_dotenv never overrides the environment) must not be seeded.
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+os.environ["DATABASE_ASYNC_URL"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def seed(db, owner_id, count, rng):
+    from app.services import PostService
+
+    for start in range(0, count, 1000):
+        texts = [
+            " ".join(rng.choices(VOCABULARY[:500], k=15))
+            + f" {rng.choice(VOCABULARY)}"
+            for _ in range(min(1000, count - start))
+        ]
+        PostService.create_posts(db, texts, owner_id)
+
+
+def best_time(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    from sqlalchemy import select
+
+    from app.database.models import Post
+    from app.database.session import SessionLocal, engine
+    from app.main import create_tables
+    from app.services import PostService, SearchService
+    from app.services.search import (
+        MemorySearchBackend,
+        SQLiteSearchBackend,
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--counts",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[1000, 10000, 100000],
+    )
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    create_tables()
+    rng = random.Random(42)
+    backends = {
+        "fts5": SQLiteSearchBackend(),
+        "memory": MemorySearchBackend(max_users=10),
+    }
+    queries = {"rare": "word4999", "common": "word7"}
+
+    print(f"{'posts':>7} {'query':<7} {'backend':<7} {'ms':>8}")
+    with SessionLocal() as db:
+        for owner_id, count in enumerate(args.counts, start=1):
+            seed(db, owner_id, count, rng)
+            for label, query in queries.items():
+                for name, backend in backends.items():
+                    SearchService.configure(backend)
+
+                    def run():
+                        PostService.search_posts(
+                            db, owner_id, query, limit=20
+                        )
+                        db.rollback()
+
+                    run()
+                    seconds = best_time(run, args.rounds)
+                    print(
+                        f"{count:>7} {label:<7} {name:<7} "
+                        f"{seconds * 1000:>8.3f}"
+                    )
+
+                def scan():
+                    db.scalars(
+                        select(Post)
+                        .where(
+                            Post.owner_id == owner_id,
+                            Post.text.like(f"%{query}%"),
+                        )
+                        .limit(20)
+                    ).all()
+                    db.rollback()
+
+                seconds = best_time(scan, args.rounds)
+                print(
+                    f"{count:>7} {label:<7} {'like':<7} "
+                    f"{seconds * 1000:>8.3f}"
+                )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""End-to-end benchmark suite with JSON baselines.
+
+Boots the real app from ``app.main.get_application`` against a
+throwaway SQLite file and drives it in-process through httpx's ASGI
+transport. Each scenario reports requests per second and p50/p95/p99
+latency:
+
+- ``signup`` / ``login``: bcrypt-bound auth endpoints;
+- ``token_validation``: GET /posts/ with a fresh token per request and
+  the page cached, so JWT verification dominates;
+- ``posts_cold`` / ``posts_warm``: GET /posts/ with the user's cache
+  namespace invalidated before every request, and left warm;
+- ``create_N`` / ``delete_N``: POST /posts/ and DELETE /posts/{id} for
+  a user who already has N posts.
+
+Results can be saved as a baseline and later compared against it;
+``--compare`` exits non-zero when any scenario's throughput drops by
+more than ``--threshold`` or its p95 grows by more than
+``--latency-threshold`` (looser by default, since tails are noisier).
+Baselines are only comparable on the same machine.
+
+Usage:
+    python -m benchmarks.suite [--save PATH] [--compare PATH]
+        [--threshold 0.2] [--latency-threshold 0.5]
+        [--scenarios NAME ...] [--requests N]
+        [--auth-requests N] [--concurrency C] [--post-counts 10,1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+# Always a throwaway database: an exported or .env DATABASE_URL
+# (load_dotenv never overrides the environment) must not be seeded.
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+os.environ["DATABASE_ASYNC_URL"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(__file__), "baselines", "sqlite.json"
+)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * fraction))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def drive(client, make_request, requests, concurrency):
+    """Run make_request(i) for every i with bounded concurrency."""
+    latencies = []
+    pending = iter(range(requests))
+
+    async def worker():
+        for i in pending:
+            started = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f"{response.request.method} {response.request.url} "
+                    f"returned {response.status_code}: {response.text}"
+                )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+class Suite:
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.users = 0
+
+    async def signup(self, email=None):
+        self.users += 1
+        response = await self.client.post(
+            "/auth/signup",
+            json={
+                "email": email or f"user{self.users}@example.com",
+                "password": "benchmark-password",
+            },
+        )
+        response.raise_for_status()
+        body = response.json()
+        return body["user"]["id"], body["access_token"]
+
+    def seed_posts(self, user_id, count):
+        from app.database.session import SessionLocal
+        from app.services import PostService
+
+        with SessionLocal() as db:
+            return [
+                post.id
+                for post in PostService.create_posts(
+                    db, [f"seed {i}" for i in range(count)], user_id
+                )
+            ]
+
+    async def run(self, names):
+        results = {}
+        for name, scenario in self.scenarios():
+            if names and not any(name.startswith(n) for n in names):
+                continue
+            print(f"running {name}...", file=sys.stderr)
+            results[name] = await scenario()
+        return results
+
+    def scenarios(self):
+        yield "signup", self.bench_signup
+        yield "login", self.bench_login
+        yield "token_validation", self.bench_token_validation
+        yield "posts_cold", lambda: self.bench_posts(cold=True)
+        yield "posts_warm", lambda: self.bench_posts(cold=False)
+        for count in self.args.post_counts:
+            yield f"create_{count}", lambda c=count: self.bench_create(c)
+            yield f"delete_{count}", lambda c=count: self.bench_delete(c)
+
+    async def bench_signup(self):
+        base = self.users
+
+        async def request(client, i):
+            return await client.post(
+                "/auth/signup",
+                json={
+                    "email": f"signup{base + i}@example.com",
+                    "password": "benchmark-password",
+                },
+            )
+
+        self.users += self.args.auth_requests
+        return await drive(
+            self.client,
+            request,
+            self.args.auth_requests,
+            self.args.concurrency,
+        )
+
+    async def bench_login(self):
+        await self.signup("login@example.com")
+
+        async def request(client, i):
+            return await client.post(
+                "/auth/login",
+                data={
+                    "username": "login@example.com",
+                    "password": "benchmark-password",
+                },
+            )
+
+        return await drive(
+            self.client,
+            request,
+            self.args.auth_requests,
+            self.args.concurrency,
+        )
+
+    async def bench_token_validation(self):
+        from app.services import AuthService
+
+        user_id, token = await self.signup()
+        self.seed_posts(user_id, 10)
+        tokens = [
+            AuthService.create_access_token(
+                {"sub": str(user_id), "n": i}
+            )
+            for i in range(self.args.requests)
+        ]
+        await self.client.get(
+            "/posts/", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        async def request(client, i):
+            return await client.get(
+                "/posts/",
+                headers={"Authorization": f"Bearer {tokens[i]}"},
+            )
+
+        return await drive(
+            self.client, request, self.args.requests, self.args.concurrency
+        )
+
+    async def bench_posts(self, cold):
+        from app.services import CacheService, PostService
+
+        user_id, token = await self.signup()
+        self.seed_posts(user_id, 100)
+        headers = {"Authorization": f"Bearer {token}"}
+        namespace = PostService.cache_namespace(user_id)
+
+        async def request(client, i):
+            if cold:
+                CacheService.invalidate(namespace)
+            return await client.get("/posts/", headers=headers)
+
+        return await drive(
+            self.client, request, self.args.requests, self.args.concurrency
+        )
+
+    async def bench_create(self, count):
+        user_id, token = await self.signup()
+        self.seed_posts(user_id, count)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def request(client, i):
+            return await client.post(
+                "/posts/", json={"text": f"post {i}"}, headers=headers
+            )
+
+        return await drive(
+            self.client, request, self.args.requests, self.args.concurrency
+        )
+
+    async def bench_delete(self, count):
+        user_id, token = await self.signup()
+        post_ids = self.seed_posts(user_id, count + self.args.requests)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def request(client, i):
+            return await client.delete(
+                f"/posts/{post_ids[i]}", headers=headers
+            )
+
+        return await drive(
+            self.client, request, self.args.requests, self.args.concurrency
+        )
+
+
+async def run_suite(args):
+    import httpx
+
+    from app.database.session import engine
+    from app.main import create_tables, get_application
+
+    create_tables()
+    transport = httpx.ASGITransport(app=get_application())
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            return await Suite(client, args).run(args.scenarios)
+    finally:
+        engine.dispose()
+
+
+def compare(results, baseline, threshold, latency_threshold):
+    """Print each scenario against its baseline; return regressions."""
+    regressions = []
+    print(
+        f"{'scenario':<18} {'rps':>9} {'base':>9} "
+        f"{'p95':>9} {'base':>9}"
+    )
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<18} {result['rps']:>9} {'-':>9}")
+            continue
+        slower = result["rps"] < base["rps"] * (1 - threshold)
+        laggier = result["p95_ms"] > base["p95_ms"] * (
+            1 + latency_threshold
+        )
+        flag = "  REGRESSION" if slower or laggier else ""
+        print(
+            f"{name:<18} {result['rps']:>9} {base['rps']:>9} "
+            f"{result['p95_ms']:>8}ms {base['p95_ms']:>8}ms{flag}"
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--latency-threshold", type=float, default=0.5)
+    parser.add_argument("--scenarios", nargs="*", default=[])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--auth-requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--post-counts",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[10, 1000],
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "auth_requests": args.auth_requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(
+            results, baseline, args.threshold, args.latency_threshold
+        )
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
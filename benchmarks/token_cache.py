@@ -0,0 +1,50 @@
+"""Measure JWT verification with and without the verified-token cache.
+
+Decodes the same token repeatedly through ``SecurityUtils.decode_token``
+with the cache cleared before every call (cold) and left warm, and
+reports the per-call latency of each.
+
+Usage:
+    python -m benchmarks.token_cache [--iterations N]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+
+def measure(decode, token, iterations, before=None):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        decode(token)
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    from app.utils.security import SecurityUtils, token_cache
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = SecurityUtils.create_access_token({"sub": "1"})
+    cold = measure(
+        SecurityUtils.decode_token,
+        token,
+        args.iterations,
+        before=token_cache.clear,
+    )
+    warm = measure(SecurityUtils.decode_token, token, args.iterations)
+
+    print(f"{'mode':<6} {'us/call':>10}")
+    print(f"{'cold':<6} {cold * 1e6:>10.2f}")
+    print(f"{'warm':<6} {warm * 1e6:>10.2f}")
+    print(f"speedup {cold / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,94 @@
-import pytest
+import asyncio
+import json
+import pstats
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock
 
+import fakeredis
 import pytest
-from sqlalchemy.orm import Session
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, inspect
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
+from app import main
+from app.config import settings
+from app.database import Base
 from app.database.models import Post, User
+from app.database.instrumentation import (
+    install_query_hooks,
+    track_queries,
+)
+from app.database.pool import InstrumentedQueuePool
+from app.database.routing import ReplicaSet, RoutingSession
+from app.dependencies.auth import (
+    get_current_principal,
+    get_current_user,
+)
+from app.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    ServerTimingMiddleware,
+    SQLStatsMiddleware,
+)
+from app.middleware.compression import negotiate_encoding
+from app.middleware.metrics import MetricsRegistry
+from app.middleware.profiling import (
+    list_profiles,
+    profile_threadpool_calls,
+    sign_profile_token,
+)
+from app.routes import metrics as metrics_routes
+from app.routes import posts as posts_routes
+from app.routes.metrics import get_metrics
+from app.routes.posts import not_modified, page_cache_key, page_etag
 from app.schemas.auth import UserCreate
+from app.services import auth as auth_service
 from app.services.auth import AuthService
-from app.services.cache import CacheService
-from app.services.posts import PostService
+from app.services.cache import (
+    CacheService,
+    MemoryCacheBackend,
+    TwoTierCacheBackend,
+    _Stamped,
+    build_cache_backend,
+)
+from app.services.group_commit import GroupCommitWriter
+from app.services.posts import AsyncPostService, PostService
+from app.services.search import (
+    MemorySearchBackend,
+    SearchService,
+    SQLiteSearchBackend,
+)
+from app.utils import security
+from app.utils.security import (
+    PasswordHashingPool,
+    SecurityUtils,
+    VerifiedTokenCache,
+    token_cache,
+)
 from app.utils.exceptions import (
     AuthenticationError,
+    HashingUnavailableError,
+    InvalidCursorError,
+    PostNotFoundError,
+    QueryBudgetExceededError,
+    SecurityException,
+    UnauthorizedError,
     UserAlreadyExistsError,
 )
+from app.utils.timing import phase, record_phase
 
 
 @pytest.fixture
@@ -20,6 +96,22 @@ def mock_db():
     return MagicMock(spec=Session)
 
 
+@pytest.fixture
+def sqlite_db():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+
 class TestAuthService:
     """Unit tests for AuthService."""
 
@@ -68,35 +160,205 @@ class TestAuthService:
                 mock_db, "test@example.com", "password"
             )
 
-    def test_create_user_success(self):
-        mock_db = MagicMock()
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+    def test_create_user_success(self, sqlite_db):
         user_data = UserCreate(email="new@example.com", password="SecurePass123!")
-        
-        user = AuthService.create_user(mock_db, user_data)
-        assert mock_db.add.called
-        assert mock_db.commit.called
+
+        user = AuthService.create_user(sqlite_db, user_data)
         assert isinstance(user, User)
+        assert user.id is not None
+        assert user.email == "new@example.com"
 
-    def test_create_user_exists(self):
-        mock_db = MagicMock()
-        mock_db.query.return_value.filter.return_value.first.return_value = User()
+    def test_create_user_exists(self, sqlite_db):
         user_data = UserCreate(email="exists@example.com", password="SecurePass123!")
-        
+        AuthService.create_user(sqlite_db, user_data)
+
         with pytest.raises(UserAlreadyExistsError):
-            AuthService.create_user(mock_db, user_data)
+            AuthService.create_user(sqlite_db, user_data)
+        assert sqlite_db.query(User).count() == 1
+
+    def test_other_integrity_errors_are_not_duplicates(self, sqlite_db):
+        sqlite_db.add(User(email="email@example.com", password_hash=None))
+        with pytest.raises(exc.IntegrityError) as error:
+            sqlite_db.flush()
+        sqlite_db.rollback()
+
+        assert not AuthService.is_duplicate_email(error.value)
+        assert AuthService.integrity_error(error.value) is error.value
+
+    def test_duplicate_email_matched_by_index_name(self):
+        def integrity_error(constraint_name, message):
+            orig = Exception(message)
+            orig.diag = MagicMock(constraint_name=constraint_name)
+            return exc.IntegrityError("INSERT", {}, orig)
+
+        assert AuthService.is_duplicate_email(
+            integrity_error("ix_users_email", "doppelter Schlüssel")
+        )
+        assert not AuthService.is_duplicate_email(
+            integrity_error("users_email_check", "email is invalid")
+        )
+
+    def test_async_login_waits_without_a_threadpool_thread(
+        self, sqlite_db, monkeypatch
+    ):
+        pool = PasswordHashingPool(workers=1, max_queue=1, timeout=5)
+        monkeypatch.setattr(auth_service, "password_hasher", pool)
+        release = threading.Event()
+        verify = security.pwd_context.verify
+
+        def blocking_verify(*args):
+            release.wait(5)
+            return verify(*args)
+
+        user_data = UserCreate(
+            email="async@example.com", password="SecurePass123!"
+        )
+
+        async def test():
+            user = await AuthService.acreate_user(sqlite_db, user_data)
+            monkeypatch.setattr(
+                security.pwd_context, "verify", blocking_verify
+            )
+            login = asyncio.create_task(
+                AuthService.aauthenticate_user(
+                    sqlite_db, user_data.email, user_data.password
+                )
+            )
+            while pool.stats()["running"] == 0:
+                await asyncio.sleep(0.01)
+            assert current_default_thread_limiter().borrowed_tokens == 0
+            release.set()
+            assert (await login).id == user.id
+            with pytest.raises(AuthenticationError):
+                await AuthService.aauthenticate_user(
+                    sqlite_db, user_data.email, "wrong"
+                )
+
+        asyncio.run(test())
+
+    def test_user_cache_invalidated_on_update(self, sqlite_db):
+        user = User(email="cached@example.com", password_hash="x")
+        sqlite_db.add(user)
+        sqlite_db.commit()
+        AuthService.cache_user(user)
+        assert AuthService.get_cached_user(str(user.id)) is user
+
+        user.email = "changed@example.com"
+        sqlite_db.commit()
+        assert AuthService.get_cached_user(str(user.id)) is None
+
+
+class TestCurrentUserDependency:
+    """Unit tests for the authentication dependencies."""
+
+    def test_cached_user_skips_database(self, mock_db):
+        user = User(id=42, email="a@example.com", password_hash="x")
+        AuthService.cache_user(user)
+        token = AuthService.create_access_token({"sub": "42"})
+
+        assert get_current_user(None, token, mock_db) is user
+        assert not mock_db.query.called
+        AuthService.invalidate_user(42)
+
+    def test_miss_loads_and_caches_user(self, mock_db):
+        user = User(id=43, email="b@example.com", password_hash="x")
+        mock_db.query.return_value.filter.return_value.first.return_value = (
+            user
+        )
+        token = AuthService.create_access_token({"sub": "43"})
+
+        assert get_current_user(None, token, mock_db) is user
+        assert mock_db.rollback.called
+        assert AuthService.get_cached_user("43") is user
+        AuthService.invalidate_user(43)
+
+    def test_trusted_claims_skip_lookup(self, mock_db, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+        token = AuthService.create_access_token({"sub": "44"})
+
+        principal = get_current_principal(None, token, mock_db)
+        assert principal.id == 44
+        assert not mock_db.query.called
+
+    def test_invalid_token_is_rejected(self, mock_db):
+        with pytest.raises(HTTPException) as exc:
+            get_current_user(None, "not-a-token", mock_db)
+        assert exc.value.status_code == 401
 
 
 class TestPostService:
     """Unit tests for PostService."""
 
-    def test_create_post(self, mock_db):
+    def test_create_tables_indexes_existing_posts(
+        self, tmp_path, monkeypatch
+    ):
+        engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_posts_owner_id_id")
+        monkeypatch.setattr(main, "engine", engine)
+
+        main.create_tables()
+
+        indexes = inspect(engine).get_indexes("posts")
+        assert "ix_posts_owner_id_id" in {i["name"] for i in indexes}
+        engine.dispose()
+
+    def test_create_post(self, sqlite_db):
         post = PostService.create_post(
-            mock_db, "Test post", 1
+            sqlite_db, "Test post", 1
         )
-        assert mock_db.add.called
-        assert mock_db.commit.called
         assert isinstance(post, Post)
+        assert post.id is not None
+        assert post not in sqlite_db
+
+    def test_create_post_invalidates_cache(self, mock_db):
+        namespace = PostService.cache_namespace(1)
+        key = CacheService.versioned_key(namespace)
+
+        PostService.create_post(mock_db, "Test post", 1)
+        assert CacheService.versioned_key(namespace) != key
+
+    def test_create_posts_inserts_in_order(self, sqlite_db):
+        namespace = PostService.cache_namespace(1)
+        key = CacheService.versioned_key(namespace)
+
+        posts = PostService.create_posts(
+            sqlite_db, [f"Post {i}" for i in range(3)], 1
+        )
+        assert [p.text for p in posts] == ["Post 0", "Post 1", "Post 2"]
+        assert [p.id for p in posts] == sorted(p.id for p in posts)
+        assert sqlite_db.query(Post).count() == 3
+        assert CacheService.versioned_key(namespace) != key
+
+    def test_delete_post_invalidates_cache(self, mock_db):
+        mock_db.execute.return_value.rowcount = 1
+        namespace = PostService.cache_namespace(1)
+        key = CacheService.versioned_key(namespace)
+
+        PostService.delete_post(mock_db, 5, 1)
+        assert mock_db.execute.call_count == 1
+        assert mock_db.commit.called
+        assert CacheService.versioned_key(namespace) != key
+
+    def test_delete_post_checks_owner(self, sqlite_db):
+        post_id = PostService.create_post(sqlite_db, "Post", 1).id
+
+        with pytest.raises(UnauthorizedError):
+            PostService.delete_post(sqlite_db, post_id, 2)
+        PostService.delete_post(sqlite_db, post_id, 1)
+        with pytest.raises(PostNotFoundError):
+            PostService.delete_post(sqlite_db, post_id, 1)
+
+    def test_delete_posts_skips_foreign_posts(self, sqlite_db):
+        mine = PostService.create_posts(sqlite_db, ["a", "b"], 1)
+        theirs = PostService.create_post(sqlite_db, "c", 2)
+
+        deleted = PostService.delete_posts(
+            sqlite_db, [p.id for p in mine] + [theirs.id, 999], 1
+        )
+        assert deleted == 2
+        assert sqlite_db.query(Post).one().owner_id == 2
 
     def test_get_user_posts(self, mock_db):
         mock_posts = [
@@ -111,6 +373,64 @@ class TestPostService:
         assert len(posts) == 2
         assert all(isinstance(p, Post) for p in posts)
 
+    def test_encode_page(self):
+        posts = [Post(id=1, text='say "hi"', owner_id=7)]
+
+        body = PostService.encode_page(posts, 1)
+        assert json.loads(body) == {
+            "items": [{"id": 1, "text": 'say "hi"', "owner_id": 7}],
+            "next_cursor": PostService.encode_cursor(1),
+        }
+        assert json.loads(PostService.encode_page([], None)) == {
+            "items": [],
+            "next_cursor": None,
+        }
+
+    def test_cursor_round_trip(self):
+        cursor = PostService.encode_cursor(12345)
+        assert "12345" not in cursor
+        assert PostService.decode_cursor(cursor) == 12345
+
+        with pytest.raises(InvalidCursorError):
+            PostService.decode_cursor("not a cursor!")
+
+    def test_get_user_posts_page_walks_keyset(self, sqlite_db):
+        for i in range(5):
+            sqlite_db.add(Post(text=f"Post {i}", owner_id=1))
+        sqlite_db.add(Post(text="Other", owner_id=2))
+        sqlite_db.commit()
+
+        pages = []
+        after_id = None
+        while True:
+            posts, after_id = PostService.get_user_posts_page(
+                sqlite_db, 1, limit=2, after_id=after_id
+            )
+            pages.append([p.text for p in posts])
+            if after_id is None:
+                break
+
+        assert pages == [
+            ["Post 0", "Post 1"],
+            ["Post 2", "Post 3"],
+            ["Post 4"],
+        ]
+
+    def test_export_user_posts_streams_ndjson_batches(self, sqlite_db):
+        for i in range(5):
+            sqlite_db.add(Post(text=f"Post {i}", owner_id=1))
+        sqlite_db.add(Post(text="Other", owner_id=2))
+        sqlite_db.commit()
+
+        chunks = list(
+            PostService.export_user_posts(sqlite_db, 1, batch_size=2)
+        )
+        assert len(chunks) == 3
+        lines = b"".join(chunks).decode().splitlines()
+        assert [json.loads(line)["text"] for line in lines] == [
+            f"Post {i}" for i in range(5)
+        ]
+
 
 class TestCacheService:
     """Unit tests for CacheService."""
@@ -124,3 +444,938 @@ class TestCacheService:
             "temp_key", {"data": 456}, expire_seconds=-1
         )
         assert CacheService.get("temp_key") is None
+
+    def test_delete_drops_entry(self):
+        CacheService.set("user_posts_1", [1, 2])
+        CacheService.delete("user_posts_1")
+        assert CacheService.get("user_posts_1") is None
+
+    def test_invalidate_changes_versioned_key(self):
+        key = CacheService.versioned_key("ns")
+        assert CacheService.versioned_key("ns") == key
+        CacheService.set(key, b"[]")
+
+        CacheService.invalidate("ns")
+        new_key = CacheService.versioned_key("ns")
+        assert new_key != key
+        assert CacheService.get(new_key) is None
+
+    def test_version_is_reseeded_after_eviction(self):
+        before = CacheService.invalidate("ns_evicted")
+        CacheService.delete("ns_evicted:version")
+        assert CacheService.get_version("ns_evicted") > before
+
+
+class TestMemoryCacheBackend:
+    """Unit tests for the bounded LRU cache engine."""
+
+    def test_lru_eviction_by_entry_count(self):
+        backend = MemoryCacheBackend(max_entries=2, max_bytes=10**6)
+        backend.set("a", 1, 60)
+        backend.set("b", 2, 60)
+        assert backend.get("a") == 1
+        backend.set("c", 3, 60)
+
+        assert backend.get("b") is None
+        assert backend.get("a") == 1
+        assert backend.get("c") == 3
+        assert backend.stats()["evictions"] == 1
+
+    def test_eviction_by_byte_budget(self):
+        backend = MemoryCacheBackend(max_entries=100, max_bytes=300)
+        backend.set("a", b"x" * 100, 60)
+        backend.set("b", b"x" * 100, 60)
+        backend.set("c", b"x" * 100, 60)
+
+        stats = backend.stats()
+        assert stats["bytes"] <= 300
+        assert backend.get("a") is None
+
+    def test_oversized_value_is_not_stored(self):
+        backend = MemoryCacheBackend(max_entries=100, max_bytes=50)
+        backend.set("a", b"x" * 100, 60)
+        assert backend.get("a") is None
+
+    def test_expired_entries_are_swept_on_write(self):
+        now = [0.0]
+        backend = MemoryCacheBackend(
+            max_entries=100, max_bytes=10**6, clock=lambda: now[0]
+        )
+        backend.set("a", 1, 10)
+        now[0] = 11.0
+        backend.set("b", 2, 10)
+
+        stats = backend.stats()
+        assert stats["entries"] == 1
+        assert stats["expirations"] == 1
+
+    def test_concurrent_seeds_agree_on_one_value(self):
+        interval = sys.getswitchinterval()
+        # Switch threads often so racing seeds actually interleave.
+        sys.setswitchinterval(1e-6)
+        try:
+            for _ in range(50):
+                backend = MemoryCacheBackend(
+                    max_entries=10, max_bytes=10**6
+                )
+                start = threading.Barrier(8)
+
+                def seed(initial):
+                    start.wait()
+                    return backend.incr("ns:version", 0, initial, 60)
+
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    results = list(pool.map(seed, range(8)))
+
+                assert len(set(results)) == 1
+                assert backend.get("ns:version") == results[0]
+        finally:
+            sys.setswitchinterval(interval)
+
+    def test_hit_and_miss_counters(self):
+        backend = MemoryCacheBackend(max_entries=10, max_bytes=10**6)
+        backend.set("a", 1, 60)
+        backend.get("a")
+        backend.get("missing")
+
+        stats = backend.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+
+def run_async(test):
+    """Run an async test body against a fresh in-memory database."""
+
+    async def runner():
+        engine = create_async_engine(
+            "sqlite+aiosqlite://", poolclass=StaticPool
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with async_sessionmaker(
+                engine, expire_on_commit=False
+            )() as db:
+                await test(db)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(runner())
+
+
+class TestAsyncPostService:
+    """Unit tests for AsyncPostService."""
+
+    def test_create_and_page(self):
+        async def test(db):
+            for i in range(3):
+                await AsyncPostService.create_post(db, f"Post {i}", 1)
+
+            posts, after_id = await AsyncPostService.get_user_posts_page(
+                db, 1, limit=2
+            )
+            assert [p.text for p in posts] == ["Post 0", "Post 1"]
+            posts, after_id = await AsyncPostService.get_user_posts_page(
+                db, 1, limit=2, after_id=after_id
+            )
+            assert [p.text for p in posts] == ["Post 2"]
+            assert after_id is None
+
+        run_async(test)
+
+    def test_delete_post_checks_owner(self):
+        async def test(db):
+            post = await AsyncPostService.create_post(db, "Post", 1)
+            post_id = post.id
+
+            with pytest.raises(UnauthorizedError):
+                await AsyncPostService.delete_post(db, post_id, 2)
+            await AsyncPostService.delete_post(db, post_id, 1)
+            with pytest.raises(PostNotFoundError):
+                await AsyncPostService.delete_post(db, post_id, 1)
+
+        run_async(test)
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+def make_two_tier(server):
+    backend = TwoTierCacheBackend(
+        l1=MemoryCacheBackend(max_entries=100, max_bytes=10**6),
+        client=fakeredis.FakeRedis(server=server),
+        channel="invalidation",
+        l1_expire_seconds=60,
+    )
+    backend.start()
+    return backend
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTwoTierCacheBackend:
+    """Unit tests for the L1 + shared L2 cache engine."""
+
+    def test_unresponsive_redis_falls_back_quickly(self, monkeypatch):
+        # Accepts connections (via the backlog) but never replies.
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        host, port = server.getsockname()
+        monkeypatch.setattr(settings, "CACHE_BACKEND", "redis")
+        monkeypatch.setattr(
+            settings, "REDIS_URL", f"redis://{host}:{port}/0"
+        )
+        monkeypatch.setattr(settings, "REDIS_SOCKET_TIMEOUT_SECONDS", 0.1)
+        try:
+            backend = build_cache_backend()
+            started = time.monotonic()
+            backend.set("k", b"[]", 60)
+            assert backend.get("k") == b"[]"
+            assert backend.get("missing") is None
+            assert time.monotonic() - started < 2
+            backend.stop()
+        finally:
+            server.close()
+
+    def test_l2_is_shared_between_workers(self, redis_server):
+        worker_a = make_two_tier(redis_server)
+        worker_b = make_two_tier(redis_server)
+        try:
+            worker_a.set("k", b"[]", 60)
+            worker_a.set("obj", {"a": 1}, 60)
+
+            assert worker_b.get("k") == b"[]"
+            assert worker_b.get("obj") == {"a": 1}
+            assert worker_b.stats()["l2_hits"] == 2
+            assert worker_b.get("k") == b"[]"
+            assert worker_b.stats()["l1_hits"] == 1
+
+            worker_a.set("page", _Stamped(12.5, b"[]"), 60)
+            worker_a.set("dict", _Stamped(12.5, {"a": 1}), 60)
+            assert worker_b.get("page") == _Stamped(12.5, b"[]")
+            assert worker_b.get("dict") == _Stamped(12.5, {"a": 1})
+        finally:
+            worker_a.stop()
+            worker_b.stop()
+
+    def test_invalidation_evicts_other_workers_l1(self, redis_server):
+        worker_a = make_two_tier(redis_server)
+        worker_b = make_two_tier(redis_server)
+        try:
+            version = worker_b.incr("ns:version", 0, 100, 60)
+            assert worker_a.incr("ns:version", 0, 999, 60) == version
+            assert worker_b.l1.get("ns:version") == version
+
+            assert worker_a.incr("ns:version", 1, 999, 60) == 101
+            assert wait_for(
+                lambda: worker_b.l1.get("ns:version") is None
+            )
+            assert worker_b.incr("ns:version", 0, 999, 60) == 101
+        finally:
+            worker_a.stop()
+            worker_b.stop()
+
+    def test_falls_back_to_l1_when_l2_is_down(self):
+        client = MagicMock()
+        client.pipeline.side_effect = ConnectionError
+        client.set.side_effect = ConnectionError
+        backend = TwoTierCacheBackend(
+            l1=MemoryCacheBackend(max_entries=10, max_bytes=10**6),
+            client=client,
+            channel="invalidation",
+            l1_expire_seconds=60,
+        )
+
+        backend.set("k", b"[]", 60)
+        assert backend.get("k") == b"[]"
+        assert backend.get("missing") is None
+        assert backend.incr("v", 1, 5, 60) == 5
+
+    def test_async_loads_run_off_the_event_loop(
+        self, redis_server, monkeypatch
+    ):
+        backend = make_two_tier(redis_server)
+        monkeypatch.setattr(CacheService, "_backend", backend)
+        threads = []
+        get = backend.get
+
+        def recording_get(key):
+            threads.append(threading.get_ident())
+            return get(key)
+
+        monkeypatch.setattr(backend, "get", recording_get)
+
+        async def load():
+            return b"[]"
+
+        async def run():
+            loop_thread = threading.get_ident()
+            assert await CacheService.aget_or_load("k", load) == b"[]"
+            assert await CacheService.aget_or_load("k", load) == b"[]"
+            return loop_thread
+
+        try:
+            loop_thread = asyncio.run(run())
+        finally:
+            backend.stop()
+        assert threads
+        assert loop_thread not in threads
+
+
+class TestCacheLoading:
+    """Unit tests for single-flight loads and stale-while-revalidate."""
+
+    def test_concurrent_misses_run_loader_once(self):
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(2)
+            return b"[1]"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [
+                pool.submit(
+                    CacheService.get_or_load, "sf_key", loader
+                )
+                for _ in range(8)
+            ]
+            assert wait_for(
+                lambda: CacheService.stats()["coalesced"] >= 1
+            )
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == [b"[1]"] * 8
+        assert len(calls) == 1
+        assert CacheService.get("sf_key") == b"[1]"
+
+    def test_loader_error_reaches_caller_and_is_not_cached(self):
+        def loader():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            CacheService.get_or_load("err_key", loader)
+        assert CacheService.get_or_load("err_key", lambda: 1) == 1
+
+    def test_stale_value_served_while_refreshing(self):
+        refreshed = threading.Event()
+
+        def refresh():
+            refreshed.set()
+            return b"new"
+
+        CacheService.get_or_load(
+            "swr_key", lambda: b"old", expire_seconds=0, stale_seconds=60
+        )
+
+        value = CacheService.get_or_load(
+            "swr_key", refresh, stale_seconds=60
+        )
+        assert value == b"old"
+        assert refreshed.wait(2)
+        assert wait_for(
+            lambda: CacheService.get("swr_key") == b"new"
+        )
+
+    def test_fresh_hit_reads_backend_once(self, monkeypatch):
+        backend = MemoryCacheBackend(max_entries=10, max_bytes=10**6)
+        monkeypatch.setattr(CacheService, "_backend", backend)
+        CacheService.get_or_load(
+            "hit_key", lambda: b"v", stale_seconds=60
+        )
+
+        value = CacheService.get_or_load(
+            "hit_key", lambda: b"other", stale_seconds=60
+        )
+        assert value == b"v"
+        stats = backend.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_async_concurrent_misses_run_loader_once(self):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return b"[2]"
+
+        async def test():
+            return await asyncio.gather(
+                *(
+                    CacheService.aget_or_load("async_key", loader)
+                    for _ in range(8)
+                )
+            )
+
+        assert asyncio.run(test()) == [b"[2]"] * 8
+        assert len(calls) == 1
+
+
+class TestPasswordHashingPool:
+    """Unit tests for the bounded password hashing pool."""
+
+    def test_rejects_when_saturated(self):
+        pool = PasswordHashingPool(workers=1, max_queue=1, timeout=5)
+        release = threading.Event()
+        with ThreadPoolExecutor(max_workers=2) as callers:
+            busy = [
+                callers.submit(pool.run, release.wait, 5)
+                for _ in range(2)
+            ]
+            assert wait_for(lambda: pool.stats()["queue_depth"] == 1)
+
+            with pytest.raises(HashingUnavailableError):
+                pool.run(lambda: None)
+            release.set()
+            assert all(f.result() for f in busy)
+
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+
+    def test_times_out_slow_calls(self):
+        pool = PasswordHashingPool(workers=1, max_queue=1, timeout=0.05)
+        release = threading.Event()
+
+        with pytest.raises(HashingUnavailableError):
+            pool.run(release.wait, 5)
+        release.set()
+        assert pool.stats()["timeouts"] == 1
+
+    def test_async_hash_and_verify(self):
+        pool = PasswordHashingPool(workers=1, max_queue=1, timeout=5)
+
+        async def test():
+            hashed = await pool.ahash("SecurePass123!")
+            return await pool.averify("SecurePass123!", hashed)
+
+        assert asyncio.run(test()) is True
+
+
+class TestVerifiedTokenCache:
+    """Unit tests for the verified JWT cache."""
+
+    def test_expires_and_evicts(self):
+        now = [1000.0]
+        cache = VerifiedTokenCache(max_entries=2, clock=lambda: now[0])
+        cache.put("a", {"sub": "1", "exp": 1010})
+        cache.put("b", {"sub": "2", "exp": 2000})
+        cache.put("c", {"sub": "3", "exp": 2000})
+
+        assert cache.get("a") is None
+        assert cache.get("c") == {"sub": "3", "exp": 2000}
+        now[0] = 2000.0
+        assert cache.get("c") is None
+
+    def test_decode_token_is_cached_and_revocable(self):
+        token = SecurityUtils.create_access_token({"sub": "42"})
+        token_cache.clear()
+        SecurityUtils.decode_token(token)
+        hits = token_cache.stats()["hits"]
+
+        assert SecurityUtils.decode_token(token)["sub"] == "42"
+        assert token_cache.stats()["hits"] == hits + 1
+
+        SecurityUtils.revoke_token(token)
+        with pytest.raises(SecurityException):
+            SecurityUtils.decode_token(token)
+
+
+class TestGroupCommitWriter:
+    """Unit tests for the group-commit writer."""
+
+    def test_coalesces_concurrent_inserts(self, sqlite_db):
+        committed = []
+        writer = GroupCommitWriter(
+            sessionmaker(bind=sqlite_db.get_bind()),
+            Post,
+            window_seconds=0.05,
+            max_batch=100,
+            on_commit=committed.extend,
+        )
+        with ThreadPoolExecutor(max_workers=10) as callers:
+            posts = list(
+                callers.map(
+                    lambda i: writer.submit(text=f"Post {i}", owner_id=i),
+                    range(10),
+                )
+            )
+        writer.stop()
+
+        assert [(p.text, p.owner_id) for p in posts] == [
+            (f"Post {i}", i) for i in range(10)
+        ]
+        assert len({p.id for p in posts}) == 10
+        assert len(committed) == 10
+        assert writer.stats()["batches"] < 10
+        assert sqlite_db.query(Post).count() == 10
+
+    def test_survives_cancelled_asubmit(self, sqlite_db):
+        factory = sessionmaker(bind=sqlite_db.get_bind())
+        release = threading.Event()
+
+        def blocking_factory():
+            # Hold the writer in its first commit so the next row is
+            # still queued when its caller is cancelled.
+            release.wait(5)
+            return factory()
+
+        writer = GroupCommitWriter(
+            blocking_factory,
+            Post,
+            window_seconds=0,
+            max_batch=1,
+            timeout_seconds=5,
+        )
+        first = ThreadPoolExecutor(max_workers=1).submit(
+            writer.submit, text="First", owner_id=1
+        )
+
+        async def cancel_one():
+            task = asyncio.create_task(
+                writer.asubmit(text="Cancelled", owner_id=1)
+            )
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_one())
+        release.set()
+        first.result(5)
+        post = writer.submit(text="Kept", owner_id=1)
+        writer.stop()
+
+        assert post.text == "Kept"
+        assert sorted(p.text for p in sqlite_db.query(Post)) == [
+            "First",
+            "Kept",
+        ]
+
+    def test_asubmit_times_out_when_the_writer_stalls(self, sqlite_db):
+        factory = sessionmaker(bind=sqlite_db.get_bind())
+        release = threading.Event()
+
+        def blocking_factory():
+            release.wait(5)
+            return factory()
+
+        writer = GroupCommitWriter(
+            blocking_factory,
+            Post,
+            window_seconds=0,
+            max_batch=1,
+            timeout_seconds=0.1,
+        )
+        first = ThreadPoolExecutor(max_workers=1).submit(
+            writer.submit, text="First", owner_id=1
+        )
+
+        async def submit():
+            return await writer.asubmit(text="Dropped", owner_id=1)
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(submit())
+        release.set()
+        with pytest.raises(TimeoutError):
+            first.result(5)
+        writer.stop()
+
+        assert [p.text for p in sqlite_db.query(Post)] == ["First"]
+
+
+class TestInstrumentedQueuePool:
+    """Unit tests for connection pool metrics."""
+
+    def test_reports_checkouts_and_timeouts(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path}/pool.db",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.01,
+        )
+        try:
+            conn = engine.connect()
+            assert engine.pool.stats()["checked_out"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            conn.invalidate()
+            conn.close()
+
+            stats = engine.pool.stats()
+            assert stats["checked_out"] == 0
+            assert stats["checkouts"] == 2
+            assert stats["timeouts"] == 1
+            assert stats["invalidations"] == 1
+        finally:
+            engine.dispose()
+
+
+class TestRoutingSession:
+    """Unit tests for read-replica routing."""
+
+    def test_reads_replicas_until_first_write(self, tmp_path):
+        engines = {}
+        for name in ("primary", "replica1", "replica2"):
+            engines[name] = create_engine(
+                f"sqlite:///{tmp_path}/{name}.db"
+            )
+            Base.metadata.create_all(engines[name])
+            with Session(engines[name]) as db:
+                db.add(Post(text=name, owner_id=1))
+                db.commit()
+        Routed = sessionmaker(
+            class_=RoutingSession,
+            bind=engines["primary"],
+            replicas=ReplicaSet(
+                [engines["replica1"], engines["replica2"]], "round_robin"
+            ),
+        )
+
+        def texts(db):
+            return [p.text for p in PostService.get_user_posts(db, 1)]
+
+        with Routed() as db:
+            assert texts(db) == ["replica1"]
+            PostService.create_post(db, "new", 1)
+            assert texts(db) == ["primary", "new"]
+        with Routed() as db:
+            assert texts(db) == ["replica2"]
+        for engine in engines.values():
+            engine.dispose()
+
+    def test_cache_loads_read_primary(self, tmp_path, monkeypatch):
+        engines = {}
+        for name in ("primary", "replica"):
+            engines[name] = create_engine(
+                f"sqlite:///{tmp_path}/{name}.db"
+            )
+            Base.metadata.create_all(engines[name])
+            with Session(engines[name]) as db:
+                db.add(Post(text=name, owner_id=1))
+                db.commit()
+        monkeypatch.setattr(
+            posts_routes,
+            "SessionLocal",
+            sessionmaker(
+                class_=RoutingSession,
+                bind=engines["primary"],
+                replicas=ReplicaSet([engines["replica"]], "round_robin"),
+            ),
+        )
+
+        page = json.loads(posts_routes._load_posts_page(1, 10, None))
+
+        assert [item["text"] for item in page["items"]] == ["primary"]
+        for engine in engines.values():
+            engine.dispose()
+
+
+class TestSQLStats:
+    """Unit tests for per-request SQL instrumentation."""
+
+    def test_flags_lazy_load_n_plus_one(self, sqlite_db):
+        install_query_hooks()
+        for i in range(3):
+            user = User(email=f"u{i}@example.com", password_hash="x")
+            sqlite_db.add(user)
+            sqlite_db.flush()
+            sqlite_db.add(Post(text="Post", owner_id=user.id))
+        sqlite_db.commit()
+        sqlite_db.expunge_all()
+
+        with track_queries() as stats:
+            for post in sqlite_db.query(Post).all():
+                post.owner.email
+
+        assert stats.count == 4
+        assert [count for _, count in stats.duplicates(3)] == [3]
+
+    def test_failed_statement_keeps_the_original_error(self, sqlite_db):
+        install_query_hooks()
+        sqlite_db.add(User(email="dup@example.com", password_hash="x"))
+        sqlite_db.commit()
+
+        with track_queries() as stats:
+            sqlite_db.add(
+                User(email="dup@example.com", password_hash="x")
+            )
+            with pytest.raises(exc.IntegrityError):
+                sqlite_db.flush()
+            sqlite_db.rollback()
+            assert sqlite_db.query(User).count() == 1
+
+        assert not sqlite_db.connection().info.get("query_started")
+        assert stats.count == 1
+
+    def test_strict_budget_raises(self, sqlite_db, monkeypatch):
+        install_query_hooks()
+        app = FastAPI()
+        app.add_middleware(SQLStatsMiddleware)
+
+        @app.get("/posts/{post_id}")
+        def get_post(post_id: int):
+            sqlite_db.get(Post, post_id)
+            sqlite_db.query(Post).count()
+            return {}
+
+        monkeypatch.setattr(settings, "SQL_STATS_DEBUG", True)
+        monkeypatch.setattr(
+            settings, "SQL_QUERY_BUDGETS", {"GET /posts/{post_id}": 1}
+        )
+        monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_STRICT", True)
+        with pytest.raises(QueryBudgetExceededError):
+            TestClient(app).get("/posts/1")
+
+        monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_STRICT", False)
+        response = TestClient(app).get("/posts/2")
+        assert response.headers["X-DB-Query-Count"] == "2"
+
+
+class TestMetricsMiddleware:
+    """Unit tests for per-route request metrics."""
+
+    def test_records_route_status_and_latency(self):
+        registry = MetricsRegistry()
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+        @app.get("/posts/{post_id}")
+        def get_post(post_id: int):
+            return {}
+
+        client = TestClient(app)
+        client.get("/posts/1")
+        client.get("/posts/2")
+        client.get("/missing")
+
+        text = "\n".join(registry.render())
+        assert (
+            'http_requests_total{method="GET",route="/posts/{post_id}",'
+            'status="200"} 2'
+        ) in text
+        assert 'route="<unmatched>",status="404"} 1' in text
+        assert (
+            'http_request_duration_seconds_bucket{method="GET",'
+            'route="/posts/{post_id}",le="+Inf"} 2'
+        ) in text
+        assert registry.in_flight == 0
+
+    def test_exposes_password_hashing_pool(self):
+        SecurityUtils.get_password_hash("metrics-password")
+
+        response = asyncio.run(get_metrics())
+
+        text = response.body.decode()
+        assert "password_hash_queue_depth 0" in text
+        assert "password_hash_completed_total" in text
+        assert "password_hash_seconds_avg" in text
+
+    def test_endpoint_requires_internal_token(self, monkeypatch):
+        app = FastAPI()
+        app.include_router(metrics_routes.router)
+        client = TestClient(app)
+
+        monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", None)
+        assert client.get("/metrics").status_code == 404
+
+        monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "token")
+        assert client.get("/metrics").status_code == 403
+        response = client.get(
+            "/metrics", headers={"X-Internal-Token": "token"}
+        )
+        assert response.status_code == 200
+        assert "jwt_cache_hits_total" in response.text
+        assert "password_hash_completed_total" in response.text
+
+
+class TestProfilingMiddleware:
+    """Unit tests for opt-in request profiling."""
+
+    def test_profiles_signed_requests_only(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "PROFILING_SECRET", "secret")
+        monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware)
+
+        def render_post(post_id):
+            return {"id": post_id}
+
+        @app.get("/posts/{post_id}")
+        def get_post(post_id: int):
+            return render_post(post_id)
+
+        profile_threadpool_calls(app)
+        client = TestClient(app)
+        assert "x-profile-id" not in client.get("/posts/1").headers
+        forged = client.get(
+            "/posts/1", headers={"X-Profile-Token": "9999999999.00"}
+        )
+        assert "x-profile-id" not in forged.headers
+
+        response = client.get(
+            "/posts/1", headers={"X-Profile-Token": sign_profile_token()}
+        )
+
+        name = response.headers["x-profile-id"]
+        assert "-GET-posts_post_id-" in name
+        assert [p["name"] for p in list_profiles(str(tmp_path))] == [name]
+        stats = pstats.Stats(str(tmp_path / name))
+        assert any(
+            function == "render_post" for _, _, function in stats.stats
+        )
+
+
+class TestServerTiming:
+    """Unit tests for per-request phase timings."""
+
+    def test_nested_phases_are_exclusive(self, monkeypatch):
+        monkeypatch.setattr(settings, "SERVER_TIMING_HEADER", True)
+        app = FastAPI()
+        app.add_middleware(ServerTimingMiddleware)
+
+        @app.get("/posts/")
+        def get_posts():
+            with phase("cache"):
+                time.sleep(0.02)
+                record_phase("db", 0.015)
+            return []
+
+        response = TestClient(app).get("/posts/")
+
+        timings = dict(
+            entry.split(";dur=")
+            for entry in response.headers["server-timing"].split(", ")
+        )
+        assert set(timings) == {"cache", "db", "app", "total"}
+        assert float(timings["db"]) == 15.0
+        assert 5 <= float(timings["cache"]) < 15
+        assert float(timings["total"]) >= 20
+
+
+class TestPostsETag:
+    """Unit tests for conditional GET /posts/."""
+
+    def test_etag_changes_with_posts_version(self):
+        etag = page_etag(page_cache_key(7, 20, None))
+        request = Request(
+            {
+                "type": "http",
+                "headers": [
+                    (b"if-none-match", f'"other", {etag}'.encode())
+                ],
+            }
+        )
+        assert not_modified(request, etag)
+        assert page_etag(page_cache_key(7, 10, None)) != etag
+
+        CacheService.invalidate(PostService.cache_namespace(7))
+
+        new_etag = page_etag(page_cache_key(7, 20, None))
+        assert new_etag != etag
+        assert not not_modified(request, new_etag)
+
+
+class TestCompressionMiddleware:
+    """Unit tests for negotiated response compression."""
+
+    def test_negotiates_and_applies_thresholds(self):
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding("gzip;q=0, identity") is None
+        assert negotiate_encoding("br") is None
+
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware)
+        text = "post " * 1000
+
+        @app.get("/large")
+        def large():
+            return {"text": text}
+
+        @app.get("/small")
+        def small():
+            return {"text": "post"}
+
+        @app.get("/stream")
+        def stream():
+            return StreamingResponse(
+                iter([text.encode()] * 3), media_type="text/plain"
+            )
+
+        client = TestClient(app)
+        headers = {"Accept-Encoding": "gzip"}
+        large_response = client.get("/large", headers=headers)
+        small_response = client.get("/small", headers=headers)
+        stream_response = client.get("/stream", headers=headers)
+
+        assert large_response.headers["content-encoding"] == "gzip"
+        assert int(large_response.headers["content-length"]) < 1000
+        assert large_response.json() == {"text": text}
+        assert "content-encoding" not in small_response.headers
+        assert stream_response.headers["content-encoding"] == "gzip"
+        assert stream_response.text == text * 3
+
+
+class TestPostSearch:
+    """Unit tests for full-text search over posts."""
+
+    @pytest.mark.parametrize(
+        "backend",
+        [SQLiteSearchBackend(), MemorySearchBackend(max_users=10)],
+        ids=["fts5", "memory"],
+    )
+    def test_ranked_and_kept_in_sync(self, sqlite_db, backend):
+        backend.setup(sqlite_db.get_bind())
+        SearchService.configure(backend)
+        try:
+            posts = PostService.create_posts(
+                sqlite_db,
+                [
+                    "fast cache",
+                    "fast fast fast database",
+                    "slow database",
+                ],
+                1,
+            )
+            PostService.create_posts(sqlite_db, ["fast database"], 2)
+            ids = [post.id for post in posts]
+
+            hits, next_offset = PostService.search_posts(
+                sqlite_db, 1, "Database FAST", limit=10
+            )
+            assert [post.id for post, _ in hits] == [ids[1]]
+            assert next_offset is None
+
+            hits, next_offset = PostService.search_posts(
+                sqlite_db, 1, "fast", limit=1
+            )
+            assert [post.id for post, _ in hits] == [ids[1]]
+            assert next_offset == 1
+
+            PostService.delete_post(sqlite_db, ids[1], 1)
+            PostService.create_post(sqlite_db, "fast writes", 1)
+            hits, _ = PostService.search_posts(
+                sqlite_db, 1, "fast", limit=10
+            )
+            assert sorted(post.text for post, _ in hits) == [
+                "fast cache",
+                "fast writes",
+            ]
+        finally:
+            SearchService.configure(
+                MemorySearchBackend(settings.SEARCH_MEMORY_MAX_USERS)
+            )